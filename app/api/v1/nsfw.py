@@ -431,6 +431,7 @@ async def _generate_nsfw_inner(data: NSFWRequest) -> Dict[str, Any]:
                             video_length=effective_video_length,
                             resolution=effective_resolution,
                             preset=task_preset,
+                            collect_only=True,
                         )
                         raw_video_response = await VideoCollectProcessor(
                             "grok-imagine-1.0-video",
@@ -463,6 +464,7 @@ async def _generate_nsfw_inner(data: NSFWRequest) -> Dict[str, Any]:
                         video_length=effective_video_length,
                         resolution=effective_resolution,
                         preset=task_preset,
+                        collect_only=True,
                     )
                     raw_video_response = await VideoCollectProcessor(
                         "grok-imagine-1.0-video",
@@ -493,6 +495,7 @@ async def _generate_nsfw_inner(data: NSFWRequest) -> Dict[str, Any]:
                             video_length=effective_video_length,
                             resolution_name=effective_resolution,
                             preset=task_preset,
+                            collect_only=True,
                         )
                         raw_video_response = await VideoCollectProcessor(
                             "grok-imagine-1.0-video",
@@ -525,6 +528,7 @@ async def _generate_nsfw_inner(data: NSFWRequest) -> Dict[str, Any]:
                                 video_length=effective_video_length,
                                 resolution=effective_resolution,
                                 preset=task_preset,
+                                collect_only=True,
                             )
                             raw_video_response = await VideoCollectProcessor(
                                 "grok-imagine-1.0-video",
@@ -5,7 +5,6 @@ import uuid
 from typing import Optional, List, Dict, Any
 
 import orjson
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel, Field
@@ -459,6 +458,9 @@ async def public_video_vendor(filename: str):
             headers={"Cache-Control": "public, max-age=86400"},
         )
 
+    # 仅在 vendor 缓存未命中时用到，延迟导入以缩短冷启动的模块导入时间
+    import httpx
+
     timeout = httpx.Timeout(connect=8.0, read=60.0, write=30.0, pool=8.0)
     last_error = None
     async with httpx.AsyncClient(timeout=timeout) as client:
@@ -199,6 +199,8 @@ class Config:
         self._defaults = {}
         self._code_defaults = {}
         self._defaults_loaded = False
+        # 配置版本号：每次加载/更新后递增，供调用方缓存派生值并据此失效
+        self.version = 0
 
     def register_defaults(self, defaults: Dict[str, Any]):
         """注册代码中定义的默认值"""
@@ -267,6 +269,7 @@ class Config:
         except Exception as e:
             logger.error(f"Error loading config: {e}")
             self._config = {}
+        self.version += 1
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -296,6 +299,7 @@ class Config:
             merged = _deep_merge(base, new_config or {})
             await storage.save_config(merged)
             self._config = merged
+            self.version += 1
 
 
 # 全局配置实例
@@ -106,6 +106,19 @@ class UpstreamException(AppException):
         self.details = details
 
 
+class UnsupportedContentError(AppException):
+    """上游资源内容类型不符合预期"""
+
+    def __init__(self, content_type: str):
+        super().__init__(
+            message=f"Unsupported content type: {content_type}",
+            error_type=ErrorType.SERVER.value,
+            code="unsupported_content",
+            status_code=502,
+        )
+        self.content_type = content_type
+
+
 class StreamIdleTimeoutError(Exception):
     """流空闲超时错误"""
 
@@ -17,12 +17,13 @@ from app.core.exceptions import (
     ErrorType,
     UpstreamException,
     StreamIdleTimeoutError,
+    UnsupportedContentError,
 )
 from app.core.logger import logger
 from app.services.grok.utils.process import (
     BaseProcessor,
     _with_idle_timeout,
-    _normalize_line,
+    _normalize_line_bytes,
     _collect_images,
     _is_http2_error,
 )
@@ -34,6 +35,11 @@ from app.services.grok.utils.stream import wrap_stream_with_usage
 from app.services.token import EffortType
 
 
+_PARENT_POST_RE = re.compile(
+    r"/generated/([a-f0-9-]+)/|/users/[^/]+/([a-f0-9-]+)/content"
+)
+
+
 @dataclass
 class ImageEditResult:
     stream: bool
@@ -89,6 +95,16 @@ def _is_upload_network_error(exc: Exception) -> bool:
     return False
 
 
+# 图片下载进度的最小上报间隔（秒）
+_PROGRESS_MIN_INTERVAL = 0.1
+
+# 按已下载张数预先计算的进度值（第 3 张起封顶 90）
+_DOWNLOAD_PROGRESS = tuple(min(90, 64 + i * 12) for i in range(4))
+
+# 预生成的下载进度文案，超出范围时再按需格式化
+_DOWNLOADED_MESSAGES = tuple(f"已下载第 {i} 张图片" for i in range(17))
+
+
 def _normalize_fallback_image_url(url: str) -> str:
     """下载失败时的兜底 URL 规范化。"""
     raw = str(url or "").strip()
@@ -171,22 +187,8 @@ class ImageEditService:
                     16,
                     "正在上传输入图片",
                 )
-                image_urls = await self._upload_images(images, current_token)
-                await self._emit_progress(
-                    progress_cb,
-                    "upload_done",
-                    30,
-                    f"图片上传完成，共 {len(image_urls)} 张",
-                    count=len(image_urls),
-                )
-                await self._emit_progress(
-                    progress_cb,
-                    "pre_create_start",
-                    36,
-                    "正在创建媒体帖子",
-                )
-                parent_post_id = await self._get_parent_post_id(
-                    current_token, image_urls
+                image_urls, parent_post_id = await self._upload_with_parent_post(
+                    images, current_token, progress_cb
                 )
                 await self._emit_progress(
                     progress_cb,
@@ -536,6 +538,51 @@ class ImageEditService:
 
         return image_urls
 
+    async def _upload_with_parent_post(
+        self,
+        images: List[str],
+        token: str,
+        progress_cb: Callable[[str, dict], Any] | None = None,
+    ) -> tuple[List[str], str]:
+        """上传输入图片，并在其余图片上传期间并行创建媒体帖子。
+
+        parentPostId 只依赖第一张图片，因此首图上传完成后即可预创建；
+        TaskGroup 保证任一任务失败或请求被取消时，另一任务会被及时取消。
+        """
+        first_urls = await self._upload_images(images[:1], token)
+        rest = images[1:]
+
+        async def _finish_uploads() -> List[str]:
+            image_urls = first_urls + (await self._upload_images(rest, token) if rest else [])
+            # 进度顺序与串行流程保持一致：上传完成（30）后才是创建媒体帖子（36）
+            await self._emit_progress(
+                progress_cb,
+                "upload_done",
+                30,
+                f"图片上传完成，共 {len(image_urls)} 张",
+                count=len(image_urls),
+            )
+            await self._emit_progress(
+                progress_cb,
+                "pre_create_start",
+                36,
+                "正在创建媒体帖子",
+            )
+            return image_urls
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                parent_task = tg.create_task(
+                    self._get_parent_post_id(token, first_urls)
+                )
+                upload_task = tg.create_task(_finish_uploads())
+        except* Exception as eg:
+            # 还原首个异常（含网络错误等非 AppException），编辑重试循环才能照常分类与换 token
+            raise eg.exceptions[0]
+
+        image_urls = upload_task.result()
+        return image_urls, parent_task.result()
+
     async def _get_parent_post_id(self, token: str, image_urls: List[str]) -> str:
         parent_post_id = None
         try:
@@ -549,18 +596,13 @@ class ImageEditService:
             return parent_post_id
 
         for url in image_urls:
-            match = re.search(r"/generated/([a-f0-9-]+)/", url)
+            match = _PARENT_POST_RE.search(url)
             if match:
-                parent_post_id = match.group(1)
+                parent_post_id = match.group(1) or match.group(2)
                 logger.debug(f"Parent post ID: {parent_post_id}")
-                break
-            match = re.search(r"/users/[^/]+/([a-f0-9-]+)/content", url)
-            if match:
-                parent_post_id = match.group(1)
-                logger.debug(f"Parent post ID: {parent_post_id}")
-                break
+                return parent_post_id
 
-        return parent_post_id or ""
+        return ""
 
     async def _collect_images(
         self,
@@ -635,11 +677,11 @@ class ImageStreamProcessor(BaseProcessor):
 
         try:
             async for line in _with_idle_timeout(response, idle_timeout, self.model):
-                line = _normalize_line(line)
-                if not line:
+                raw = _normalize_line_bytes(line)
+                if not raw:
                     continue
                 try:
-                    data = orjson.loads(line)
+                    data = orjson.loads(raw)
                 except orjson.JSONDecodeError:
                     continue
 
@@ -676,30 +718,39 @@ class ImageStreamProcessor(BaseProcessor):
                                 except Exception as e:
                                     logger.warning(
                                         "Image stream URL resolve failed, fallback to raw URL: "
-                                        f"error={e}"
+                                        "error={}",
+                                        e,
                                     )
                                     processed = _normalize_fallback_image_url(url)
                                 if processed:
                                     final_images.append(processed)
                                 continue
+                            dl_service = self._get_dl()
                             try:
-                                dl_service = self._get_dl()
-                                base64_data = await dl_service.parse_b64(
+                                b64, _ = await dl_service.fetch_b64(
                                     url, self.token, "image"
                                 )
-                                if base64_data:
-                                    if "," in base64_data:
-                                        b64 = base64_data.split(",", 1)[1]
-                                    else:
-                                        b64 = base64_data
-                                    final_images.append(b64)
+                            except UnsupportedContentError as e:
+                                # 内容类型不符是确定性失败，直接返回原始 URL，不再重复下载
+                                logger.warning(
+                                    "Image is not downloadable as base64, using URL: {}",
+                                    e,
+                                )
+                                processed = _normalize_fallback_image_url(url)
+                                if processed:
+                                    final_images.append(processed)
+                                continue
                             except Exception as e:
                                 logger.warning(
-                                    f"Failed to convert image to base64, falling back to URL: {e}"
+                                    "Failed to convert image to base64, falling back to URL: {}",
+                                    e,
                                 )
                                 processed = await self.process_url(url, "image")
                                 if processed:
                                     final_images.append(processed)
+                                continue
+                            if b64:
+                                final_images.append(b64)
                     continue
 
             for index, b64 in enumerate(final_images):
@@ -741,13 +792,13 @@ class ImageStreamProcessor(BaseProcessor):
             )
         except RequestsError as e:
             if _is_http2_error(e):
-                logger.warning(f"HTTP/2 stream error in image: {e}")
+                logger.warning("HTTP/2 stream error in image: {}", e)
                 raise UpstreamException(
                     message="Upstream connection closed unexpectedly",
                     status_code=502,
                     details={"error": str(e), "type": "http2_stream_error"},
                 )
-            logger.error(f"Image stream request error: {e}")
+            logger.error("Image stream request error: {}", e)
             raise UpstreamException(
                 message=f"Upstream request failed: {e}",
                 status_code=502,
@@ -755,7 +806,8 @@ class ImageStreamProcessor(BaseProcessor):
             )
         except Exception as e:
             logger.error(
-                f"Image stream processing error: {e}",
+                "Image stream processing error: {}",
+                e,
                 extra={"error_type": type(e).__name__},
             )
             raise
@@ -778,6 +830,8 @@ class ImageCollectProcessor(BaseProcessor):
         super().__init__(model, token)
         self.response_format = response_format
         self.progress_cb = progress_cb
+        self._reported_count = 0
+        self._reported_at = 0.0
 
     async def _emit_progress(
         self, event: str, progress: int, message: str, **extra: Any
@@ -794,6 +848,79 @@ class ImageCollectProcessor(BaseProcessor):
         except Exception:
             pass
 
+    async def _resolve_image(self, url: str) -> str:
+        """下载单张图片并转换为目标格式，失败时回退为 URL。"""
+        if self.response_format == "url":
+            try:
+                return await self.process_url(url, "image")
+            except Exception as e:
+                logger.warning(
+                    "Image collect URL resolve failed, fallback to raw URL: error={}", e
+                )
+                return _normalize_fallback_image_url(url)
+        try:
+            dl_service = self._get_dl()
+            b64, _ = await dl_service.fetch_b64(url, self.token, "image")
+            return b64
+        except UnsupportedContentError as e:
+            # 内容类型不符是确定性失败，直接返回原始 URL，不再重复下载
+            logger.warning("Image is not downloadable as base64, using URL: {}", e)
+            return _normalize_fallback_image_url(url)
+        except Exception as e:
+            logger.warning(
+                "Failed to convert image to base64, falling back to URL: {}", e
+            )
+            timeout = max(1, int(get_config("asset.download_timeout")))
+            try:
+                return await asyncio.wait_for(
+                    self.process_url(url, "image"), timeout=timeout
+                )
+            except Exception as fallback_err:
+                # 兜底也失败时返回原始 URL，不向 TaskGroup 抛出，避免取消同批其他下载
+                logger.warning(
+                    "Image URL fallback failed, using raw URL: error={}", fallback_err
+                )
+                return _normalize_fallback_image_url(url)
+
+    async def _collect_urls(self, urls: List[str], images: List[str]) -> None:
+        """并发下载一批图片，按完成顺序上报进度，按原始顺序写入结果。"""
+        results: List[str] = [""] * len(urls)
+        downloaded = len(images)
+        pending = len(urls)
+        loop = asyncio.get_running_loop()
+
+        async def _fetch(index: int, url: str) -> None:
+            nonlocal downloaded, pending
+            processed = await self._resolve_image(url)
+            pending -= 1
+            if processed:
+                results[index] = processed
+                downloaded += 1
+            # 合并上报：批次完成或距上次上报超过最小间隔时才发送最新计数
+            now = loop.time()
+            if downloaded > self._reported_count and (
+                pending == 0 or now - self._reported_at >= _PROGRESS_MIN_INTERVAL
+            ):
+                self._reported_count = downloaded
+                self._reported_at = now
+                await self._emit_progress(
+                    "image_downloaded",
+                    _DOWNLOAD_PROGRESS[downloaded] if downloaded < 4 else 90,
+                    _DOWNLOADED_MESSAGES[downloaded]
+                    if downloaded < len(_DOWNLOADED_MESSAGES)
+                    else f"已下载第 {downloaded} 张图片",
+                    count=downloaded,
+                )
+
+        # 全局下载信号量（asset.download_concurrent）负责限制实际并发
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for index, url in enumerate(urls):
+                    tg.create_task(_fetch(index, url))
+        finally:
+            # 即使批次中途失败或被取消，已完成的图片也照常写入结果
+            images.extend(result for result in results if result)
+
     async def process(self, response: AsyncIterable[bytes]) -> List[str]:
         """Process and collect images."""
         images = []
@@ -802,11 +929,11 @@ class ImageCollectProcessor(BaseProcessor):
 
         try:
             async for line in _with_idle_timeout(response, idle_timeout, self.model):
-                line = _normalize_line(line)
-                if not line:
+                raw = _normalize_line_bytes(line)
+                if not raw:
                     continue
                 try:
-                    data = orjson.loads(line)
+                    data = orjson.loads(raw)
                 except orjson.JSONDecodeError:
                     continue
 
@@ -821,71 +948,21 @@ class ImageCollectProcessor(BaseProcessor):
 
                 if mr := resp.get("modelResponse"):
                     if urls := _collect_images(mr):
-                        for url in urls:
-                            if self.response_format == "url":
-                                try:
-                                    processed = await self.process_url(url, "image")
-                                except Exception as e:
-                                    logger.warning(
-                                        "Image collect URL resolve failed, fallback to raw URL: "
-                                        f"error={e}"
-                                    )
-                                    processed = _normalize_fallback_image_url(url)
-                                if processed:
-                                    images.append(processed)
-                                    progress = min(90, 64 + len(images) * 12)
-                                    await self._emit_progress(
-                                        "image_downloaded",
-                                        progress,
-                                        f"已下载第 {len(images)} 张图片",
-                                        count=len(images),
-                                    )
-                                continue
-                            try:
-                                dl_service = self._get_dl()
-                                base64_data = await dl_service.parse_b64(
-                                    url, self.token, "image"
-                                )
-                                if base64_data:
-                                    if "," in base64_data:
-                                        b64 = base64_data.split(",", 1)[1]
-                                    else:
-                                        b64 = base64_data
-                                    images.append(b64)
-                                    progress = min(90, 64 + len(images) * 12)
-                                    await self._emit_progress(
-                                        "image_downloaded",
-                                        progress,
-                                        f"已下载第 {len(images)} 张图片",
-                                        count=len(images),
-                                    )
-                            except Exception as e:
-                                logger.warning(
-                                    f"Failed to convert image to base64, falling back to URL: {e}"
-                                )
-                                processed = await self.process_url(url, "image")
-                                if processed:
-                                    images.append(processed)
-                                    progress = min(90, 64 + len(images) * 12)
-                                    await self._emit_progress(
-                                        "image_downloaded",
-                                        progress,
-                                        f"已下载第 {len(images)} 张图片",
-                                        count=len(images),
-                                    )
+                        await self._collect_urls(urls, images)
 
         except asyncio.CancelledError:
             logger.debug("Image collect cancelled by client")
         except StreamIdleTimeoutError as e:
-            logger.warning(f"Image collect idle timeout: {e}")
+            logger.warning("Image collect idle timeout: {}", e)
         except RequestsError as e:
             if _is_http2_error(e):
-                logger.warning(f"HTTP/2 stream error in image collect: {e}")
+                logger.warning("HTTP/2 stream error in image collect: {}", e)
             else:
-                logger.error(f"Image collect request error: {e}")
+                logger.error("Image collect request error: {}", e)
         except Exception as e:
             logger.error(
-                f"Image collect processing error: {e}",
+                "Image collect processing error: {}",
+                e,
                 extra={"error_type": type(e).__name__},
             )
         finally:
@@ -2,8 +2,10 @@
 Responses API bridge service (OpenAI-compatible).
 """
 
+import asyncio
+import secrets
+import sys
 import time
-import uuid
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
 import orjson
@@ -19,32 +21,109 @@ _TOOL_OUTPUT_TYPES = {
     "input_tool_output",
 }
 
-_BUILTIN_TOOL_TYPES = {
-    "web_search",
-    "web_search_2025_08_26",
-    "file_search",
-    "code_interpreter",
+_TEXT_PART_TYPES = {"input_text", "output_text"}
+
+
+def _builtin_tool_function(name: str, description: str, arg: str) -> Dict[str, Any]:
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": {arg: {"type": "string"}},
+                "required": [arg],
+            },
+        },
+    }
+
+
+# 内置工具对应的 function 定义在进程内固定，导入时构建一次（只读共享）
+_BUILTIN_TOOL_FUNCTIONS: Dict[str, Dict[str, Any]] = {
+    "web_search": _builtin_tool_function(
+        "web_search", "Search the web for information and return results.", "query"
+    ),
+    "web_search_2025_08_26": _builtin_tool_function(
+        "web_search_2025_08_26",
+        "Search the web for information and return results.",
+        "query",
+    ),
+    "file_search": _builtin_tool_function(
+        "file_search", "Search provided files for relevant information.", "query"
+    ),
+    "code_interpreter": _builtin_tool_function(
+        "code_interpreter", "Execute code to solve tasks and return results.", "code"
+    ),
+}
+
+# 输出文本超过该字符数时，收尾事件的序列化放到线程池执行
+_FINAL_OFFLOAD_THRESHOLD = 64 * 1024
+
+# 只读的空字典，替代 `or {}` 兜底，避免每次分配
+_EMPTY: Dict[str, Any] = {}
+
+# 事件类型常量（驻留后在 payload 构建与前缀查表中共用同一对象）
+_EVT_CREATED = sys.intern("response.created")
+_EVT_IN_PROGRESS = sys.intern("response.in_progress")
+_EVT_OUTPUT_ITEM_ADDED = sys.intern("response.output_item.added")
+_EVT_CONTENT_PART_ADDED = sys.intern("response.content_part.added")
+_EVT_OUTPUT_TEXT_DELTA = sys.intern("response.output_text.delta")
+_EVT_OUTPUT_TEXT_DONE = sys.intern("response.output_text.done")
+_EVT_CONTENT_PART_DONE = sys.intern("response.content_part.done")
+_EVT_OUTPUT_ITEM_DONE = sys.intern("response.output_item.done")
+_EVT_FUNCTION_CALL_ARGUMENTS_DELTA = sys.intern("response.function_call_arguments.delta")
+_EVT_FUNCTION_CALL_ARGUMENTS_DONE = sys.intern("response.function_call_arguments.done")
+_EVT_COMPLETED = sys.intern("response.completed")
+
+_EVENT_TYPES = (
+    _EVT_CREATED,
+    _EVT_IN_PROGRESS,
+    _EVT_OUTPUT_ITEM_ADDED,
+    _EVT_CONTENT_PART_ADDED,
+    _EVT_OUTPUT_TEXT_DELTA,
+    _EVT_OUTPUT_TEXT_DONE,
+    _EVT_CONTENT_PART_DONE,
+    _EVT_OUTPUT_ITEM_DONE,
+    _EVT_FUNCTION_CALL_ARGUMENTS_DELTA,
+    _EVT_FUNCTION_CALL_ARGUMENTS_DONE,
+    _EVT_COMPLETED,
+)
+
+# 预编码的 SSE 事件前缀，避免每个事件都格式化并编解码
+_EVENT_PREFIXES: Dict[str, bytes] = {
+    t: f"event: {t}\ndata: ".encode() for t in _EVENT_TYPES
 }
 
+# 响应对象中在流式过程中保持不变、可预序列化的嵌套字段
+_STATIC_RESPONSE_FIELDS = (
+    "instructions",
+    "reasoning",
+    "text",
+    "tool_choice",
+    "tools",
+    "metadata",
+)
+
 
 def _now_ts() -> int:
     return int(time.time())
 
 
 def _new_response_id() -> str:
-    return f"resp_{uuid.uuid4().hex[:24]}"
+    return f"resp_{secrets.token_hex(12)}"
 
 
 def _new_message_id() -> str:
-    return f"msg_{uuid.uuid4().hex[:24]}"
+    return f"msg_{secrets.token_hex(12)}"
 
 
 def _new_tool_call_id() -> str:
-    return f"call_{uuid.uuid4().hex[:24]}"
+    return f"call_{secrets.token_hex(12)}"
 
 
 def _new_function_call_id() -> str:
-    return f"fc_{uuid.uuid4().hex[:24]}"
+    return f"fc_{secrets.token_hex(12)}"
 
 
 def _normalize_tool_choice(tool_choice: Any) -> Any:
@@ -66,106 +145,82 @@ def _normalize_tools_for_chat(tools: Optional[List[Dict[str, Any]]]) -> Optional
         if tool_type == "function":
             normalized.append(tool)
             continue
-        if tool_type in _BUILTIN_TOOL_TYPES:
-            if tool_type.startswith("web_search"):
-                normalized.append(
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": tool_type,
-                            "description": "Search the web for information and return results.",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {"query": {"type": "string"}},
-                                "required": ["query"],
-                            },
-                        },
-                    }
-                )
-            elif tool_type == "file_search":
-                normalized.append(
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": tool_type,
-                            "description": "Search provided files for relevant information.",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {"query": {"type": "string"}},
-                                "required": ["query"],
-                            },
-                        },
-                    }
-                )
-            elif tool_type == "code_interpreter":
-                normalized.append(
-                    {
-                        "type": "function",
-                        "function": {
-                            "name": tool_type,
-                            "description": "Execute code to solve tasks and return results.",
-                            "parameters": {
-                                "type": "object",
-                                "properties": {"code": {"type": "string"}},
-                                "required": ["code"],
-                            },
-                        },
-                    }
-                )
+        builtin = _BUILTIN_TOOL_FUNCTIONS.get(tool_type)
+        if builtin:
+            normalized.append(builtin)
     return normalized or None
 
 
-def _content_item_from_input(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    if not isinstance(item, dict):
+def _build_text_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    text = item.get("text") or item.get("content") or ""
+    return {"type": "text", "text": text}
+
+
+def _build_image_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    image_url = item.get("image_url")
+    url = ""
+    detail = None
+    if isinstance(image_url, dict):
+        url = image_url.get("url") or ""
+        detail = image_url.get("detail")
+    elif isinstance(image_url, str):
+        url = image_url
+    else:
+        url = item.get("url") or item.get("image") or ""
+
+    if not url:
         return None
-    item_type = item.get("type")
-
-    if item_type in {"input_text", "text", "output_text"}:
-        text = item.get("text") or item.get("content") or ""
-        return {"type": "text", "text": text}
-
-    if item_type in {"input_image", "image", "image_url", "output_image"}:
-        image_url = item.get("image_url")
-        url = ""
-        detail = None
-        if isinstance(image_url, dict):
-            url = image_url.get("url") or ""
-            detail = image_url.get("detail")
-        elif isinstance(image_url, str):
-            url = image_url
-        else:
-            url = item.get("url") or item.get("image") or ""
+    image_payload = {"url": url}
+    if detail:
+        image_payload["detail"] = detail
+    return {"type": "image_url", "image_url": image_payload}
+
+
+def _build_file_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    file_data = item.get("file_data")
+    file_id = item.get("file_id")
+    if not file_data and isinstance(item.get("file"), dict):
+        file_data = item["file"].get("file_data")
+        file_id = item["file"].get("file_id")
+    file_payload: Dict[str, Any] = {}
+    if file_data:
+        file_payload["file_data"] = file_data
+    if file_id:
+        file_payload["file_id"] = file_id
+    if not file_payload:
+        return None
+    return {"type": "file", "file": file_payload}
 
-        if not url:
-            return None
-        image_payload = {"url": url}
-        if detail:
-            image_payload["detail"] = detail
-        return {"type": "image_url", "image_url": image_payload}
-
-    if item_type in {"input_file", "file"}:
-        file_data = item.get("file_data")
-        file_id = item.get("file_id")
-        if not file_data and isinstance(item.get("file"), dict):
-            file_data = item["file"].get("file_data")
-            file_id = item["file"].get("file_id")
-        file_payload: Dict[str, Any] = {}
-        if file_data:
-            file_payload["file_data"] = file_data
-        if file_id:
-            file_payload["file_id"] = file_id
-        if not file_payload:
-            return None
-        return {"type": "file", "file": file_payload}
 
-    if item_type in {"input_audio", "audio"}:
-        audio = item.get("audio") or {}
-        data = audio.get("data") or item.get("data")
-        if not data:
-            return None
-        return {"type": "input_audio", "input_audio": {"data": data}}
+def _build_audio_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    audio = item.get("audio") or _EMPTY
+    data = audio.get("data") or item.get("data")
+    if not data:
+        return None
+    return {"type": "input_audio", "input_audio": {"data": data}}
+
+
+# 输入内容块类型 -> 构建函数，一次查表代替逐个集合判断
+_CONTENT_BUILDERS = {
+    "input_text": _build_text_item,
+    "text": _build_text_item,
+    "output_text": _build_text_item,
+    "input_image": _build_image_item,
+    "image": _build_image_item,
+    "image_url": _build_image_item,
+    "output_image": _build_image_item,
+    "input_file": _build_file_item,
+    "file": _build_file_item,
+    "input_audio": _build_audio_item,
+    "audio": _build_audio_item,
+}
 
-    return None
+
+def _content_item_from_input(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not isinstance(item, dict):
+        return None
+    builder = _CONTENT_BUILDERS.get(item.get("type"))
+    return builder(item) if builder else None
 
 
 def _message_from_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -184,6 +239,9 @@ def _message_from_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
 
 
 def _coerce_content(content: Any) -> Any:
+    # 绝大多数消息内容是纯字符串，优先走最短路径
+    if type(content) is str:
+        return content
     if content is None:
         return ""
     if isinstance(content, str):
@@ -193,16 +251,78 @@ def _coerce_content(content: Any) -> Any:
     if isinstance(content, list):
         blocks: List[Dict[str, Any]] = []
         for item in content:
-            if isinstance(item, dict) and item.get("type") in {"input_text", "output_text"}:
+            if not isinstance(item, dict):
+                continue
+            if item.get("type") in _TEXT_PART_TYPES:
                 blocks.append({"type": "text", "text": item.get("text", "")})
                 continue
-            block = _content_item_from_input(item) if isinstance(item, dict) else None
+            block = _content_item_from_input(item)
             if block:
                 blocks.append(block)
         return blocks if blocks else ""
     return str(content)
 
 
+def _flush_pending(
+    messages: List[Dict[str, Any]], pending_blocks: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    if pending_blocks:
+        messages.append({"role": "user", "content": pending_blocks})
+        return []
+    return pending_blocks
+
+
+def _handle_message_item(
+    item: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    pending_blocks: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    pending_blocks = _flush_pending(messages, pending_blocks)
+    messages.append(
+        {"role": item.get("role") or "user", "content": _coerce_content(item.get("content"))}
+    )
+    return pending_blocks
+
+
+def _handle_tool_output_item(
+    item: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    pending_blocks: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    if "role" in item and "content" in item:
+        return _handle_message_item(item, messages, pending_blocks)
+    pending_blocks = _flush_pending(messages, pending_blocks)
+    call_id = (
+        item.get("call_id")
+        or item.get("tool_call_id")
+        or item.get("id")
+        or _new_tool_call_id()
+    )
+    output = item.get("output") or item.get("content") or ""
+    messages.append({"role": "tool", "tool_call_id": call_id, "content": output})
+    return pending_blocks
+
+
+def _handle_content_item(
+    item: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    pending_blocks: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    if "role" in item and "content" in item:
+        return _handle_message_item(item, messages, pending_blocks)
+    block = _content_item_from_input(item)
+    if block:
+        pending_blocks.append(block)
+    return pending_blocks
+
+
+# 按 item type 分派处理函数；未登记的类型按内容块处理
+_ITEM_HANDLERS = {
+    "message": _handle_message_item,
+    **{item_type: _handle_tool_output_item for item_type in _TOOL_OUTPUT_TYPES},
+}
+
+
 def _coerce_input_to_messages(input_value: Any) -> List[Dict[str, Any]]:
     if input_value is None:
         return []
@@ -223,43 +343,25 @@ def _coerce_input_to_messages(input_value: Any) -> List[Dict[str, Any]]:
 
     messages: List[Dict[str, Any]] = []
     pending_blocks: List[Dict[str, Any]] = []
-
-    def _flush_pending():
-        nonlocal pending_blocks
-        if pending_blocks:
-            messages.append({"role": "user", "content": pending_blocks})
-            pending_blocks = []
+    get_handler = _ITEM_HANDLERS.get
 
     for item in input_value:
-        if isinstance(item, dict):
-            msg = _message_from_item(item)
-            if msg:
-                _flush_pending()
-                messages.append(msg)
-                continue
-
-            item_type = item.get("type")
-            if item_type in _TOOL_OUTPUT_TYPES:
-                _flush_pending()
-                call_id = (
-                    item.get("call_id")
-                    or item.get("tool_call_id")
-                    or item.get("id")
-                    or _new_tool_call_id()
-                )
-                output = item.get("output") or item.get("content") or ""
-                messages.append({"role": "tool", "tool_call_id": call_id, "content": output})
+        # 请求体由 JSON 解析而来，先按精确类型分类，子类实例才回退到 isinstance
+        item_cls = type(item)
+        if item_cls is not dict and item_cls is not str:
+            if isinstance(item, dict):
+                item_cls = dict
+            elif isinstance(item, str):
+                item_cls = str
+            else:
                 continue
-
-            block = _content_item_from_input(item)
-            if block:
-                pending_blocks.append(block)
-                continue
-
-        if isinstance(item, str):
+        if item_cls is dict:
+            handler = get_handler(item.get("type"), _handle_content_item)
+            pending_blocks = handler(item, messages, pending_blocks)
+        else:
             pending_blocks.append({"type": "text", "text": item})
 
-    _flush_pending()
+    _flush_pending(messages, pending_blocks)
     return messages
 
 
@@ -406,6 +508,29 @@ class ResponseStreamAdapter:
         self.truncation = truncation
         self.user = user
         self.metadata = metadata
+        # 响应对象中除 status/output/usage/completed_at 外的字段在流内不变，只构建一次
+        self._template = _build_response_object(
+            model=model,
+            response_id=response_id,
+            created_at=created_at,
+            status="in_progress",
+            instructions=instructions,
+            max_output_tokens=max_output_tokens,
+            parallel_tool_calls=parallel_tool_calls,
+            previous_response_id=previous_response_id,
+            reasoning_effort=reasoning_effort,
+            store=store,
+            temperature=temperature,
+            tool_choice=tool_choice,
+            tools=tools,
+            top_p=top_p,
+            truncation=truncation,
+            user=user,
+            metadata=metadata,
+        )
+        # 流内不变的嵌套字段预先序列化，后续每个生命周期事件直接拼接字节
+        for key in _STATIC_RESPONSE_FIELDS:
+            self._template[key] = orjson.Fragment(orjson.dumps(self._template[key]))
 
         self.output_text_parts: List[str] = []
         self.tool_calls_by_index: Dict[int, Dict[str, Any]] = {}
@@ -415,80 +540,98 @@ class ResponseStreamAdapter:
         self.message_id = _new_message_id()
         self.message_started = False
         self.message_output_index: Optional[int] = None
+        self._message_item: Optional[Dict[str, Any]] = None
+        self._delta_base: Dict[str, Any] = {}
+        self._in_progress_bytes: Optional[bytes] = None
 
-    def _event(self, event_type: str, payload: Dict[str, Any]) -> str:
-        return f"event: {event_type}\ndata: {orjson.dumps(payload).decode()}\n\n"
+    def _event(self, event_type: str, payload: Dict[str, Any]) -> bytes:
+        prefix = _EVENT_PREFIXES.get(event_type)
+        if prefix is None:
+            prefix = f"event: {event_type}\ndata: ".encode()
+        return prefix + orjson.dumps(payload) + b"\n\n"
 
     def _response_payload(self, *, status: str, output_text: Optional[str], usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        tool_calls = None
-        if status == "completed" and self.tool_calls_by_index:
-            tool_calls = [
-                self.tool_calls_by_index[idx]
-                for idx in sorted(self.tool_calls_by_index.keys())
-            ]
-        return _build_response_object(
-            model=self.model,
-            output_text=output_text,
-            tool_calls=tool_calls,
-            response_id=self.response_id,
-            usage=usage,
-            created_at=self.created_at,
-            status=status,
-            instructions=self.instructions,
-            max_output_tokens=self.max_output_tokens,
-            parallel_tool_calls=self.parallel_tool_calls,
-            previous_response_id=self.previous_response_id,
-            reasoning_effort=self.reasoning_effort,
-            store=self.store,
-            temperature=self.temperature,
-            tool_choice=self.tool_choice,
-            tools=self.tools,
-            top_p=self.top_p,
-            truncation=self.truncation,
-            user=self.user,
-            metadata=self.metadata,
-        )
+        output: List[Dict[str, Any]] = []
+        if output_text is not None:
+            output.append(_build_output_message(output_text))
+        payload = self._template.copy()
+        if status == "completed":
+            # 按首次出现顺序输出（与 output_index 分配顺序一致）
+            for tool_call in self.tool_calls_by_index.values():
+                output.append(_build_output_tool_call(tool_call))
+            payload["completed_at"] = _now_ts()
+        payload["status"] = status
+        payload["output"] = output
+        payload["usage"] = usage
+        return payload
+
+    def output_text(self) -> str:
+        """返回累计的输出文本；首次调用时合并分片，之后直接复用结果。"""
+        parts = self.output_text_parts
+        if len(parts) > 1:
+            parts[:] = ["".join(parts)]
+        return parts[0] if parts else ""
 
     def _alloc_output_index(self) -> int:
         idx = self.next_output_index
         self.next_output_index += 1
         return idx
 
-    def created_event(self) -> str:
-        payload = {
-            "type": "response.created",
-            "response": self._response_payload(status="in_progress", output_text=None, usage=None),
-        }
-        return self._event("response.created", payload)
+    def _in_progress_response(self) -> bytes:
+        # created 与 in_progress 携带相同的响应对象，只序列化一次
+        if self._in_progress_bytes is None:
+            self._in_progress_bytes = orjson.dumps(
+                self._response_payload(status="in_progress", output_text=None, usage=None)
+            )
+        return self._in_progress_bytes
+
+    def _lifecycle_event(self, event_type: str) -> bytes:
+        return (
+            _EVENT_PREFIXES[event_type]
+            + b'{"type":"'
+            + event_type.encode()
+            + b'","response":'
+            + self._in_progress_response()
+            + b"}\n\n"
+        )
 
-    def in_progress_event(self) -> str:
-        payload = {
-            "type": "response.in_progress",
-            "response": self._response_payload(status="in_progress", output_text=None, usage=None),
-        }
-        return self._event("response.in_progress", payload)
+    def created_event(self) -> bytes:
+        return self._lifecycle_event(_EVT_CREATED)
 
-    def ensure_message_started(self) -> List[str]:
+    def in_progress_event(self) -> bytes:
+        return self._lifecycle_event(_EVT_IN_PROGRESS)
+
+    def ensure_message_started(self) -> List[bytes]:
         if self.message_started:
             return []
         self.message_started = True
         self.message_output_index = self._alloc_output_index()
+        # 消息项在 added 事件序列化后继续复用，done 时原地更新状态与内容
         item = _build_output_message("", message_id=self.message_id, status="in_progress")
         item["content"] = []
+        self._message_item = item
+        # 文本增量事件中除 delta 外的字段在消息内不变，预先构建一次
+        self._delta_base = {
+            "type": _EVT_OUTPUT_TEXT_DELTA,
+            "response_id": self.response_id,
+            "item_id": self.message_id,
+            "output_index": self.message_output_index,
+            "content_index": self.content_index,
+        }
         events = [
             self._event(
-                "response.output_item.added",
+                _EVT_OUTPUT_ITEM_ADDED,
                 {
-                    "type": "response.output_item.added",
+                    "type": _EVT_OUTPUT_ITEM_ADDED,
                     "response_id": self.response_id,
                     "output_index": self.message_output_index,
                     "item": item,
                 },
             ),
             self._event(
-                "response.content_part.added",
+                _EVT_CONTENT_PART_ADDED,
                 {
-                    "type": "response.content_part.added",
+                    "type": _EVT_CONTENT_PART_ADDED,
                     "response_id": self.response_id,
                     "item_id": self.message_id,
                     "output_index": self.message_output_index,
@@ -499,27 +642,23 @@ class ResponseStreamAdapter:
         ]
         return events
 
-    def output_delta_event(self, delta: str) -> str:
-        return self._event(
-            "response.output_text.delta",
-            {
-                "type": "response.output_text.delta",
-                "response_id": self.response_id,
-                "item_id": self.message_id,
-                "output_index": self.message_output_index,
-                "content_index": self.content_index,
-                "delta": delta,
-            },
-        )
+    def output_delta_event(self, delta: str) -> Optional[bytes]:
+        if not delta:
+            return None
+        return self._event(_EVT_OUTPUT_TEXT_DELTA, self._delta_base | {"delta": delta})
 
-    def output_done_events(self, text: str) -> List[str]:
+    def output_done_events(self, text: str) -> List[bytes]:
         if self.message_output_index is None:
             return []
+        part = {"type": "output_text", "text": text, "annotations": []}
+        item = self._message_item
+        item["status"] = "completed"
+        item["content"] = [part]
         return [
             self._event(
-                "response.output_text.done",
+                _EVT_OUTPUT_TEXT_DONE,
                 {
-                    "type": "response.output_text.done",
+                    "type": _EVT_OUTPUT_TEXT_DONE,
                     "response_id": self.response_id,
                     "item_id": self.message_id,
                     "output_index": self.message_output_index,
@@ -528,30 +667,28 @@ class ResponseStreamAdapter:
                 },
             ),
             self._event(
-                "response.content_part.done",
+                _EVT_CONTENT_PART_DONE,
                 {
-                    "type": "response.content_part.done",
+                    "type": _EVT_CONTENT_PART_DONE,
                     "response_id": self.response_id,
                     "item_id": self.message_id,
                     "output_index": self.message_output_index,
                     "content_index": self.content_index,
-                    "part": {"type": "output_text", "text": text, "annotations": []},
+                    "part": part,
                 },
             ),
             self._event(
-                "response.output_item.done",
+                _EVT_OUTPUT_ITEM_DONE,
                 {
-                    "type": "response.output_item.done",
+                    "type": _EVT_OUTPUT_ITEM_DONE,
                     "response_id": self.response_id,
                     "output_index": self.message_output_index,
-                    "item": _build_output_message(
-                        text, message_id=self.message_id, status="completed"
-                    ),
+                    "item": item,
                 },
             ),
         ]
 
-    def ensure_tool_item(self, tool_index: int, call_id: str, name: Optional[str]) -> List[str]:
+    def ensure_tool_item(self, tool_index: int, call_id: str, name: Optional[str]) -> List[bytes]:
         if tool_index in self.tool_items:
             item = self.tool_items[tool_index]
             if name and not item.get("name"):
@@ -573,9 +710,9 @@ class ResponseStreamAdapter:
         )
         return [
             self._event(
-                "response.output_item.added",
+                _EVT_OUTPUT_ITEM_ADDED,
                 {
-                    "type": "response.output_item.added",
+                    "type": _EVT_OUTPUT_ITEM_ADDED,
                     "response_id": self.response_id,
                     "output_index": output_index,
                     "item": tool_item,
@@ -583,7 +720,7 @@ class ResponseStreamAdapter:
             )
         ]
 
-    def tool_arguments_delta_event(self, tool_index: int, delta: str) -> Optional[str]:
+    def tool_arguments_delta_event(self, tool_index: int, delta: str) -> Optional[bytes]:
         if not delta:
             return None
         item = self.tool_items.get(tool_index)
@@ -591,9 +728,9 @@ class ResponseStreamAdapter:
             return None
         item["arguments"] += delta
         return self._event(
-            "response.function_call_arguments.delta",
+            _EVT_FUNCTION_CALL_ARGUMENTS_DELTA,
             {
-                "type": "response.function_call_arguments.delta",
+                "type": _EVT_FUNCTION_CALL_ARGUMENTS_DELTA,
                 "response_id": self.response_id,
                 "item_id": item["item_id"],
                 "output_index": item["output_index"],
@@ -601,16 +738,15 @@ class ResponseStreamAdapter:
             },
         )
 
-    def tool_arguments_done_events(self) -> List[str]:
-        events: List[str] = []
-        for tool_index, item in sorted(
-            self.tool_items.items(), key=lambda kv: kv[1]["output_index"]
-        ):
+    def tool_arguments_done_events(self) -> List[bytes]:
+        events: List[bytes] = []
+        # tool_items 按插入顺序分配 output_index，直接遍历即为有序
+        for item in self.tool_items.values():
             events.append(
                 self._event(
-                    "response.function_call_arguments.done",
+                    _EVT_FUNCTION_CALL_ARGUMENTS_DONE,
                     {
-                        "type": "response.function_call_arguments.done",
+                        "type": _EVT_FUNCTION_CALL_ARGUMENTS_DONE,
                         "response_id": self.response_id,
                         "item_id": item["item_id"],
                         "output_index": item["output_index"],
@@ -628,9 +764,9 @@ class ResponseStreamAdapter:
             )
             events.append(
                 self._event(
-                    "response.output_item.done",
+                    _EVT_OUTPUT_ITEM_DONE,
                     {
-                        "type": "response.output_item.done",
+                        "type": _EVT_OUTPUT_ITEM_DONE,
                         "response_id": self.response_id,
                         "output_index": item["output_index"],
                         "item": tool_item,
@@ -653,15 +789,25 @@ class ResponseStreamAdapter:
         if arguments_delta:
             tool_call["function"]["arguments"] += arguments_delta
 
-    def completed_event(self, usage: Optional[Dict[str, Any]] = None) -> str:
+    def final_events(self) -> bytes:
+        """构建流结束时的全部收尾事件（文本/工具调用 done 与 completed）。"""
+        events: List[bytes] = []
+        full_text = self.output_text()
+        if full_text and self.message_started:
+            events.extend(self.output_done_events(full_text))
+        events.extend(self.tool_arguments_done_events())
+        events.append(self.completed_event())
+        return b"".join(events)
+
+    def completed_event(self, usage: Optional[Dict[str, Any]] = None) -> bytes:
         response = self._response_payload(
             status="completed",
-            output_text="".join(self.output_text_parts) if self.message_started else None,
+            output_text=self.output_text() if self.message_started else None,
             usage=usage
             or {"total_tokens": 0, "input_tokens": 0, "output_tokens": 0},
         )
-        payload = {"type": "response.completed", "response": response}
-        return self._event("response.completed", payload)
+        payload = {"type": _EVT_COMPLETED, "response": response}
+        return self._event(_EVT_COMPLETED, payload)
 
 
 class ResponsesService:
@@ -764,55 +910,76 @@ class ResponsesService:
             metadata=metadata,
         )
 
-        async def _stream() -> AsyncGenerator[str, None]:
-            yield adapter.created_event()
-            yield adapter.in_progress_event()
-            async for chunk in result:
-                line = proc_base._normalize_line(chunk)
-                if not line:
-                    continue
-                try:
-                    data = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                if data.get("object") == "chat.completion.chunk":
-                    delta = (data.get("choices") or [{}])[0].get("delta") or {}
-                    if "content" in delta and delta["content"]:
-                        for event in adapter.ensure_message_started():
-                            yield event
-                        adapter.output_text_parts.append(delta["content"])
-                        yield adapter.output_delta_event(delta["content"])
+        async def _stream() -> AsyncGenerator[bytes, None]:
+            yield adapter.created_event() + adapter.in_progress_event()
+            # 逐 token 调用的方法绑定为局部变量，省去循环内的属性查找
+            normalize_line = proc_base._normalize_line
+            loads = orjson.loads
+            text_parts = adapter.output_text_parts
+            ensure_message_started = adapter.ensure_message_started
+            output_delta_event = adapter.output_delta_event
+            record_tool_call = adapter.record_tool_call
+            ensure_tool_item = adapter.ensure_tool_item
+            tool_arguments_delta_event = adapter.tool_arguments_delta_event
+            tool_items = adapter.tool_items
+            try:
+                async for chunk in result:
+                    line = normalize_line(chunk)
+                    # 先做子串预筛，非 chat.completion.chunk 行无需解析 JSON
+                    if not line or "chat.completion.chunk" not in line:
+                        continue
+                    try:
+                        data = loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
+
+                    if data.get("object") != "chat.completion.chunk":
+                        continue
+                    choices = data.get("choices")
+                    if not choices:
+                        continue
+                    delta = choices[0].get("delta")
+                    if not delta:
+                        continue
+                    # 同一上游分片产生的事件合并为一次写出
+                    events: List[bytes] = []
+                    # 空内容（保活帧/仅含 role 的首帧）不触发消息开始，也不产生事件
+                    content = delta.get("content")
+                    if content:
+                        events.extend(ensure_message_started())
+                        text_parts.append(content)
+                        events.append(output_delta_event(content))
                     tool_calls = delta.get("tool_calls")
                     if isinstance(tool_calls, list):
                         for tool in tool_calls:
                             if not isinstance(tool, dict):
                                 continue
                             tool_index = tool.get("index", 0)
-                            call_id = tool.get("id") or _new_tool_call_id()
-                            fn = tool.get("function") or {}
+                            call_id = tool.get("id")
+                            # 续传分片通常不带 id，仅在首次出现该工具调用时生成
+                            if not call_id and tool_index not in tool_items:
+                                call_id = _new_tool_call_id()
+                            fn = tool.get("function") or _EMPTY
                             name = fn.get("name")
                             args_delta = fn.get("arguments") or ""
-                            adapter.record_tool_call(
-                                tool_index, call_id, name, args_delta
-                            )
-                            for event in adapter.ensure_tool_item(
-                                tool_index, call_id, name
-                            ):
-                                yield event
-                            delta_event = adapter.tool_arguments_delta_event(
-                                tool_index, args_delta
-                            )
+                            record_tool_call(tool_index, call_id, name, args_delta)
+                            events.extend(ensure_tool_item(tool_index, call_id, name))
+                            delta_event = tool_arguments_delta_event(tool_index, args_delta)
                             if delta_event:
-                                yield delta_event
-
-            full_text = "".join(adapter.output_text_parts)
-            if full_text and adapter.message_started:
-                for event in adapter.output_done_events(full_text):
-                    yield event
-            for event in adapter.tool_arguments_done_events():
-                yield event
-            yield adapter.completed_event()
+                                events.append(delta_event)
+                    if events:
+                        yield b"".join(events)
+            finally:
+                # 客户端断开时在当前任务内关闭上游流，及时释放连接
+                close_fn = getattr(result, "aclose", None)
+                if close_fn is not None:
+                    await close_fn()
+
+            # 收尾事件会多次序列化完整文本，长输出时放到线程池，避免阻塞其他连接
+            if len(adapter.output_text()) >= _FINAL_OFFLOAD_THRESHOLD:
+                yield await asyncio.to_thread(adapter.final_events)
+            else:
+                yield adapter.final_events()
 
         return _stream()
 
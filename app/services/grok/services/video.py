@@ -3,16 +3,19 @@ Grok video generation service.
 """
 
 import asyncio
-import uuid
+import inspect
+import os
 import re
+from dataclasses import dataclass
 from typing import Any, AsyncGenerator, AsyncIterable, Optional
 
 import orjson
+from curl_cffi import CurlOpt
 from curl_cffi.requests import AsyncSession
 from curl_cffi.requests.errors import RequestsError
 
 from app.core.logger import logger
-from app.core.config import get_config
+from app.core.config import config, get_config
 from app.core.exceptions import (
     UpstreamException,
     AppException,
@@ -26,7 +29,7 @@ from app.services.grok.utils.stream import wrap_stream_with_usage
 from app.services.grok.utils.process import (
     BaseProcessor,
     _with_idle_timeout,
-    _normalize_line,
+    _normalize_line_bytes,
     _is_http2_error,
 )
 from app.services.grok.utils.retry import rate_limited
@@ -37,24 +40,288 @@ from app.services.reverse.assets_list import AssetsListReverse
 
 _VIDEO_SEMAPHORE = None
 _VIDEO_SEM_VALUE = 0
+_VIDEO_SEM_VERSION = -1
+_VIDEO_SESSION: Optional[AsyncSession] = None
+_VIDEO_SESSION_CLIENTS = 0
+_VIDEO_SESSION_VERSION = -1
+_VIDEO_RETIRED_SESSIONS: list[AsyncSession] = []
+
+_IMAGINE_PUBLIC_IMAGE_PREFIX = "https://imagine-public.x.ai/imagine-public/images/"
+
+# collect_only 模式下代替 token 增量行转发的空帧（只读，收集端对其不做任何处理）
+_SKIPPED_FRAME: dict = {}
+
+# 视频 ID 允许的字符（十六进制与连字符）
+_VIDEO_ID_CHARS = frozenset("0123456789abcdefABCDEF-")
+
+# 错误归类关键字：各自合并为一个正则，一次扫描即可判定（审核类优先于网络类）
+_MODERATION_ERROR_RE = re.compile(
+    "|".join(
+        re.escape(k)
+        for k in (
+            "blocked by moderation",
+            "content moderated",
+            "content-moderated",
+            '"code":3',
+            "'code': 3",
+        )
+    )
+)
+_NETWORK_ERROR_RE = re.compile(
+    "|".join(
+        re.escape(k)
+        for k in (
+            "tls connect error",
+            "could not establish signal connection",
+            "timed out",
+            "timeout",
+            "connection closed",
+            "http/2",
+            "curl: (35)",
+            "network",
+            "proxy",
+        )
+    )
+)
+
+# 提示词归一化与泛化短句匹配（模块级预编译，避免每次调用重复构建）
+_PROMPT_STRIP_CHARS = " \t\r\n.,!?;:，。！？；：'\"`~()[]{}<>《》「」【】"
+_EN_ANIMATE_RE = re.compile(r"(please\s+)?animate(\s+this(\s+image)?)?")
+_EN_MAKE_VIDEO_RE = re.compile(r"(please\s+)?(make|create|generate)\s+(a\s+)?video")
+_ZH_GENERIC_RE = re.compile(
+    r"(请|请你|帮我|麻烦你)?(把)?(它|图片|这张图)?"
+    r"(动起来|生成视频|做成视频|制作视频)(吧|一下|下)?"
+)
+_GENERIC_PROMPT_MARKERS = ("video", "animate", "move", "动", "视频")
+_GENERIC_EN_PROMPTS = frozenset(
+    {
+        "animate",
+        "animate this",
+        "animate this image",
+        "make it move",
+        "make this move",
+        "generate video",
+        "make video",
+        "make a video",
+        "create video",
+        "turn this into a video",
+        "turn it into a video",
+        "video",
+    }
+)
+_GENERIC_ZH_PROMPTS = frozenset(
+    {
+        "动起来",
+        "让它动起来",
+        "让图片动起来",
+        "让这张图动起来",
+        "生成视频",
+        "生成一个视频",
+        "生成一段视频",
+        "做成视频",
+        "做个视频",
+        "制作视频",
+        "变成视频",
+        "变成一个视频",
+        "视频",
+    }
+)
+
+
+# 视频流内容帧的固定结尾，与 orjson 序列化整块 chunk 的输出一致
+_CONTENT_FRAME_SUFFIX = b'},"logprobs":null,"finish_reason":null}]}\n\n'
+
+
+def _fallback_video_id(src: Any) -> str:
+    """从兜底来源（视频帧或附件 ID）取出视频 ID。"""
+    if isinstance(src, dict):
+        for field in ("videoPostId", "assetId", "videoId"):
+            if video_id := str(src.get(field) or "").strip():
+                return video_id
+        return ""
+    return src or ""
+
+
+def _is_video_id(segment: str) -> bool:
+    """路径段是否为 32~36 位的十六进制/连字符视频 ID。"""
+    return 32 <= len(segment) <= 36 and _VIDEO_ID_CHARS.issuperset(segment)
+
+
+def _extract_video_id(video_url: str) -> str:
+    """从视频 URL 中提取视频 ID：/generated/{id}/ 或 /{id}/generated_video。
+
+    格式固定，用 str.find 定位路径段后校验字符集，不经过正则引擎。
+    """
+    if not video_url:
+        return ""
+    start = video_url.find("/generated/")
+    if start >= 0:
+        start += 11
+        end = video_url.find("/", start)
+        if end > 0 and _is_video_id(video_url[start:end]):
+            return video_url[start:end]
+    end = video_url.find("/generated_video")
+    if end > 0:
+        start = video_url.rfind("/", 0, end) + 1
+        if start > 0 and _is_video_id(video_url[start:end]):
+            return video_url[start:end]
+    return ""
+
 
 def _get_video_semaphore() -> asyncio.Semaphore:
     """Reverse 接口并发控制（video 服务）。"""
-    global _VIDEO_SEMAPHORE, _VIDEO_SEM_VALUE
+    global _VIDEO_SEMAPHORE, _VIDEO_SEM_VALUE, _VIDEO_SEM_VERSION
+    # 配置未变化时直接返回，省去每次获取时的配置查找与类型转换
+    if _VIDEO_SEMAPHORE is not None and _VIDEO_SEM_VERSION == config.version:
+        return _VIDEO_SEMAPHORE
+    _VIDEO_SEM_VERSION = config.version
     value = max(1, int(get_config("video.concurrent")))
     if value != _VIDEO_SEM_VALUE:
         _VIDEO_SEM_VALUE = value
-        _VIDEO_SEMAPHORE = asyncio.Semaphore(value)
+        # BoundedSemaphore：多余的 release 会直接报错，避免并发上限被悄悄放大
+        _VIDEO_SEMAPHORE = asyncio.BoundedSemaphore(value)
     return _VIDEO_SEMAPHORE
 
 
+def _is_meaningful_video_prompt(prompt: str) -> bool:
+    """is_meaningful_video_prompt 的实现（纯函数）。"""
+    text = (prompt or "").strip().lower()
+    # 只含空白/标点的提示词视为空
+    if not text.strip(_PROMPT_STRIP_CHARS):
+        return False
+    # 所有泛化短句都含以下关键字之一；不含任何关键字的提示词直接判为有效，
+    # 跳过归一化与正则匹配（绝大多数真实提示词走这条路径）
+    if not any(word in text for word in _GENERIC_PROMPT_MARKERS):
+        return True
+
+    # 统一空白与常见收尾标点
+    text = " ".join(text.split()).strip(_PROMPT_STRIP_CHARS)
+    key = "".join(text.split())
+    if not text:
+        return False
+
+    if text in _GENERIC_EN_PROMPTS or key in _GENERIC_ZH_PROMPTS:
+        return False
+
+    # 英文泛化短句：please animate this / please generate a video
+    if _EN_ANIMATE_RE.fullmatch(text):
+        return False
+    if _EN_MAKE_VIDEO_RE.fullmatch(text):
+        return False
+
+    # 中文泛化短句：请让它动起来 / 帮我生成视频 / 把这张图做成视频
+    if _ZH_GENERIC_RE.fullmatch(key):
+        return False
+
+    return True
+
+
+@dataclass(frozen=True)
+class _VideoConfig:
+    """视频请求编排用到的配置快照。"""
+
+    moderated_max_retry: int
+    auto_upscale: bool
+    max_token_retries: int
+    default_think: bool
+    default_stream: bool
+    stream_timeout: Any
+
+
+_VIDEO_CONFIG: Optional[_VideoConfig] = None
+_VIDEO_CONFIG_VERSION = -1
+
+
+def _video_cfg() -> _VideoConfig:
+    """返回视频配置快照；配置重新加载或更新后自动重建。"""
+    global _VIDEO_CONFIG, _VIDEO_CONFIG_VERSION
+    if _VIDEO_CONFIG is None or _VIDEO_CONFIG_VERSION != config.version:
+        _VIDEO_CONFIG_VERSION = config.version
+        _VIDEO_CONFIG = _VideoConfig(
+            moderated_max_retry=max(1, int(get_config("video.moderated_max_retry", 5))),
+            auto_upscale=bool(get_config("video.auto_upscale", True)),
+            max_token_retries=int(get_config("retry.max_retry")),
+            default_think=get_config("app.thinking"),
+            default_stream=get_config("app.stream"),
+            stream_timeout=get_config("video.stream_timeout"),
+        )
+    return _VIDEO_CONFIG
+
+
+def _build_video_model_config(
+    aspect_ratio: str, parent_post_id: str, resolution_name: str, video_length: int
+) -> dict:
+    """构造视频生成的 model_config_override。"""
+    return {
+        "modelMap": {
+            "videoGenModelConfig": {
+                "aspectRatio": aspect_ratio,
+                "parentPostId": parent_post_id,
+                "resolutionName": resolution_name,
+                "videoLength": video_length,
+                "isVideoEdit": False,
+            }
+        }
+    }
+
+
+def _get_video_session() -> AsyncSession:
+    """进程内共享的视频请求会话，跨请求复用连接池与 TLS 会话。"""
+    global _VIDEO_SESSION, _VIDEO_SESSION_CLIENTS, _VIDEO_SESSION_VERSION
+    if _VIDEO_SESSION is not None and _VIDEO_SESSION_VERSION == config.version:
+        return _VIDEO_SESSION
+    _VIDEO_SESSION_VERSION = config.version
+    # curl_cffi 默认只允许 10 个并发句柄，按视频并发上限放宽，避免请求在会话内排队
+    max_clients = max(10, int(get_config("video.concurrent") or 0))
+    if _VIDEO_SESSION is None or max_clients != _VIDEO_SESSION_CLIENTS:
+        if _VIDEO_SESSION is not None:
+            # 旧会话上可能仍有进行中的流，不能立即关闭，留到应用关闭时统一释放
+            _VIDEO_RETIRED_SESSIONS.append(_VIDEO_SESSION)
+        _VIDEO_SESSION_CLIENTS = max_clients
+        # PIPEWAIT 让并发请求等待复用已有的 HTTP/2 连接多路复用，而不是各自新建连接
+        _VIDEO_SESSION = AsyncSession(
+            max_clients=max_clients,
+            curl_options={CurlOpt.PIPEWAIT: 1},
+        )
+    return _VIDEO_SESSION
+
+
+async def close_video_session():
+    """关闭共享的视频请求会话（应用关闭时调用）。"""
+    global _VIDEO_SESSION, _VIDEO_SESSION_CLIENTS, _VIDEO_SESSION_VERSION
+    sessions = [*_VIDEO_RETIRED_SESSIONS, _VIDEO_SESSION]
+    _VIDEO_RETIRED_SESSIONS.clear()
+    _VIDEO_SESSION = None
+    _VIDEO_SESSION_CLIENTS = 0
+    _VIDEO_SESSION_VERSION = -1
+    for session in sessions:
+        if session is None:
+            continue
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning("Close video session failed: {}", e)
+
+
+async def _close_response(response: Any):
+    """显式释放共享会话上的响应（提前返回或出错时不依赖 GC 回收连接）。"""
+    if response is None:
+        return
+    try:
+        close_fn = getattr(response, "aclose", None) or getattr(response, "close", None)
+        if callable(close_fn):
+            result = close_fn()
+            if inspect.isawaitable(result):
+                await result
+    except Exception:
+        pass
+
+
 def _token_tag(token: str) -> str:
     raw = token[4:] if token.startswith("sso=") else token
-    if not raw:
-        return "empty"
-    if len(raw) <= 14:
-        return raw
-    return f"{raw[:6]}...{raw[-6:]}"
+    if len(raw) > 14:
+        return raw[:6] + "..." + raw[-6:]
+    return raw or "empty"
 
 
 def _classify_video_error(exc: Exception) -> tuple[str, str, int]:
@@ -64,28 +331,13 @@ def _classify_video_error(exc: Exception) -> tuple[str, str, int]:
     body = ""
     if isinstance(details, dict):
         body = str(details.get("body") or "").lower()
-    merged = f"{text}\n{body}"
-
-    if (
-        "blocked by moderation" in merged
-        or "content moderated" in merged
-        or "content-moderated" in merged
-        or '"code":3' in merged
-        or "'code': 3" in merged
-    ):
+    # 关键字均不含换行，分别扫描即可，无需拼接出可能很大的合并字符串
+    targets = (text, body) if body else (text,)
+
+    if any(_MODERATION_ERROR_RE.search(t) for t in targets):
         return ("视频生成被拒绝，请调整提示词或素材后重试", "video_rejected", 400)
 
-    if (
-        "tls connect error" in merged
-        or "could not establish signal connection" in merged
-        or "timed out" in merged
-        or "timeout" in merged
-        or "connection closed" in merged
-        or "http/2" in merged
-        or "curl: (35)" in merged
-        or "network" in merged
-        or "proxy" in merged
-    ):
+    if any(_NETWORK_ERROR_RE.search(t) for t in targets):
         return ("视频生成失败：网络连接异常，请稍后重试", "video_network_error", 502)
 
     return ("视频生成失败，请稍后重试", "video_failed", 502)
@@ -105,67 +357,7 @@ class VideoService:
         - 空提示词
         - 仅“让它动起来/生成视频/animate this”等泛化短提示
         """
-        text = (prompt or "").strip().lower()
-        if not text:
-            return False
-
-        # 统一空白与常见收尾标点
-        text = re.sub(r"\s+", " ", text).strip(
-            " \t\r\n.,!?;:，。！？；：'\"`~()[]{}<>《》「」【】"
-        )
-        key = re.sub(r"\s+", "", text)
-        if not text:
-            return False
-
-        generic_en = {
-            "animate",
-            "animate this",
-            "animate this image",
-            "make it move",
-            "make this move",
-            "generate video",
-            "make video",
-            "make a video",
-            "create video",
-            "turn this into a video",
-            "turn it into a video",
-            "video",
-        }
-        generic_zh = {
-            "动起来",
-            "让它动起来",
-            "让图片动起来",
-            "让这张图动起来",
-            "生成视频",
-            "生成一个视频",
-            "生成一段视频",
-            "做成视频",
-            "做个视频",
-            "制作视频",
-            "变成视频",
-            "变成一个视频",
-            "视频",
-        }
-        if text in generic_en or key in generic_zh:
-            return False
-
-        # 英文泛化短句：please animate this / please generate a video
-        if re.fullmatch(r"(please\s+)?animate(\s+this(\s+image)?)?", text):
-            return False
-        if re.fullmatch(
-            r"(please\s+)?(make|create|generate)\s+(a\s+)?video", text
-        ):
-            return False
-
-        # 中文泛化短句：请让它动起来 / 帮我生成视频 / 把这张图做成视频
-        if re.fullmatch(
-            r"(请|请你|帮我|麻烦你)?(把)?(它|图片|这张图)?"
-            r"(动起来|生成视频|做成视频|制作视频)(吧|一下|下)?",
-            key,
-        ):
-            return False
-
-        return True
+        return _is_meaningful_video_prompt(prompt or "")
 
     @staticmethod
     def _build_video_message(
@@ -192,21 +384,18 @@ class VideoService:
         return mode_flag
 
     @staticmethod
-    def _build_imagine_public_url(parent_post_id: str) -> str:
-        return f"https://imagine-public.x.ai/imagine-public/images/{parent_post_id}.jpg"
-
-    @staticmethod
-    def _is_moderated_line(line: bytes) -> bool:
-        text = _normalize_line(line)
-        if not text:
-            return False
+    def _parse_line(line: bytes) -> Optional[dict]:
+        """解析上游一行为 JSON 对象；空行与非 JSON 行返回 None。"""
+        # bytes 直接交给 orjson，省去 UTF-8 解码与中间 str
+        raw = _normalize_line_bytes(line)
+        # 只关心 JSON 对象：首字节不是 "{" 的保活帧/纯文本行直接丢弃，
+        # 不进入 orjson，也不会触发异常
+        if not raw or raw[0] != 0x7B:
+            return None
         try:
-            data = orjson.loads(text)
-        except Exception:
-            return False
-        resp = data.get("result", {}).get("response", {})
-        video_resp = resp.get("streamingVideoGenerationResponse", {})
-        return bool(video_resp.get("moderated") is True)
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return None
 
     async def create_post(
         self,
@@ -223,27 +412,26 @@ class VideoService:
             prompt_value = prompt if media_type == "MEDIA_POST_TYPE_VIDEO" else ""
             media_value = media_url or ""
 
-            async with AsyncSession() as session:
-                async with _get_video_semaphore():
-                    response = await MediaPostReverse.request(
-                        session,
-                        token,
-                        media_type,
-                        media_value,
-                        prompt=prompt_value,
-                    )
+            async with _get_video_semaphore():
+                response = await MediaPostReverse.request(
+                    _get_video_session(),
+                    token,
+                    media_type,
+                    media_value,
+                    prompt=prompt_value,
+                )
 
             post_id = response.json().get("post", {}).get("id", "")
             if not post_id:
                 raise UpstreamException("No post ID in response")
 
-            logger.info(f"Media post created: {post_id} (type={media_type})")
+            logger.info("Media post created: {} (type={})", post_id, media_type)
             return post_id
 
         except AppException:
             raise
         except Exception as e:
-            logger.error(f"Create post error: {e}")
+            logger.error("Create post error: {}", e)
             msg, code, status = _classify_video_error(e)
             raise AppException(
                 message=msg,
@@ -258,6 +446,108 @@ class VideoService:
             token, prompt="", media_type="MEDIA_POST_TYPE_IMAGE", media_url=image_url
         )
 
+    async def _run_video_stream(
+        self,
+        token: str,
+        message: str,
+        model_config_override: dict,
+        *,
+        token_tag: str,
+        started_log: str,
+        collect_only: bool = False,
+    ) -> AsyncGenerator[dict, None]:
+        """发起视频生成请求并转发上游流；命中审核时按配置重试。
+
+        generate* 仍是返回本生成器的协程：create_post 等准备步骤在 await 时立即执行，
+        其异常（如 429）才能落在 completions 的换 token 重试范围内。
+        collect_only 为 True 时（非流式收集）只解析视频进度与 modelResponse 行，
+        token 增量行不解析，以空帧代替转发（思考阶段较长时不会误触发空闲超时）。
+        """
+        moderated_max_retry = _video_cfg().moderated_max_retry
+        # 共享会话：审核重试与并发请求复用已建立的连接与 TLS 会话
+        session = _get_video_session()
+        parse_line = self._parse_line
+        # 重试循环只包一层 try：每轮的异常处理完全相同，且都会直接抛出
+        try:
+            for attempt in range(1, moderated_max_retry + 1):
+                moderated_hit = False
+                async with _get_video_semaphore():
+                    stream_response = await AppChatReverse.request(
+                        session,
+                        token,
+                        message=message,
+                        model="grok-3",
+                        tool_overrides={"videoGen": True},
+                        model_config_override=model_config_override,
+                    )
+                    logger.info(
+                        "{}, attempt={}/{}",
+                        started_log,
+                        attempt,
+                        moderated_max_retry,
+                    )
+                    # 每行只解析一次：在此判定审核结果，并把解析后的对象交给下游处理器。
+                    # 上游开始返回视频地址后审核结果不会再改变，之后的行不再检查
+                    moderation_possible = True
+                    try:
+                        async for line in stream_response:
+                            # 非流式收集只关心视频进度（含审核结果）与携带附件的 modelResponse 行；
+                            # 其余行不解析，但仍以空帧转发，让收集端的空闲超时把它们计为上游活动
+                            if (
+                                collect_only
+                                and b"streamingVideoGenerationResponse" not in line
+                                and b"modelResponse" not in line
+                            ):
+                                yield _SKIPPED_FRAME
+                                continue
+                            data = parse_line(line)
+                            if data is None:
+                                continue
+                            if moderation_possible:
+                                video_resp = (
+                                    data.get("result", {})
+                                    .get("response", {})
+                                    .get("streamingVideoGenerationResponse")
+                                )
+                                if video_resp:
+                                    if video_resp.get("moderated") is True:
+                                        moderated_hit = True
+                                        logger.warning(
+                                            "Video generation moderated: token={}, retry {}/{}",
+                                            token_tag,
+                                            attempt,
+                                            moderated_max_retry,
+                                        )
+                                        break
+                                    if video_resp.get("videoUrl"):
+                                        moderation_possible = False
+                            yield data
+                    finally:
+                        # 共享会话不随请求关闭：审核重试、下游断开或解析异常时都需显式释放响应
+                        await stream_response.aclose()
+
+                if not moderated_hit:
+                    return
+                if attempt < moderated_max_retry:
+                    await asyncio.sleep(1.2)
+
+            raise UpstreamException(
+                "Video blocked by moderation",
+                status_code=400,
+                details={"moderated": True, "attempts": moderated_max_retry},
+            )
+        except Exception as e:
+            logger.error("Video generation error: {}", e)
+            if isinstance(e, AppException):
+                raise
+            msg, code, status = _classify_video_error(e)
+            raise AppException(
+                message=msg,
+                error_type=ErrorType.SERVER.value if status >= 500 else ErrorType.INVALID_REQUEST.value,
+                code=code,
+                status_code=status,
+            )
+
     async def generate(
         self,
         token: str,
@@ -266,7 +556,9 @@ class VideoService:
         video_length: int = 6,
         resolution_name: str = "480p",
         preset: str = "normal",
-    ) -> AsyncGenerator[bytes, None]:
+        *,
+        collect_only: bool = False,
+    ) -> AsyncGenerator[dict, None]:
         """Generate video."""
         token_tag = _token_tag(token)
         mode = (
@@ -275,77 +567,26 @@ class VideoService:
             else "extremely-spicy-or-crazy"
         )
         logger.info(
-            f"Video generation: token={token_tag}, prompt='{prompt[:50]}...', ratio={aspect_ratio}, length={video_length}s, mode={mode}"
+            "Video generation: token={}, prompt='{}...', ratio={}, length={}s, mode={}",
+            token_tag,
+            prompt[:50],
+            aspect_ratio,
+            video_length,
+            mode,
         )
         post_id = await self.create_post(token, prompt)
         message = self._build_video_message(prompt=prompt, preset=preset)
-        model_config_override = {
-            "modelMap": {
-                "videoGenModelConfig": {
-                    "aspectRatio": aspect_ratio,
-                    "parentPostId": post_id,
-                    "resolutionName": resolution_name,
-                    "videoLength": video_length,
-                    "isVideoEdit": False,
-                }
-            }
-        }
-        moderated_max_retry = max(1, int(get_config("video.moderated_max_retry", 5)))
-
-        async def _stream():
-            for attempt in range(1, moderated_max_retry + 1):
-                session = AsyncSession()
-                moderated_hit = False
-                try:
-                    async with _get_video_semaphore():
-                        stream_response = await AppChatReverse.request(
-                            session,
-                            token,
-                            message=message,
-                            model="grok-3",
-                            tool_overrides={"videoGen": True},
-                            model_config_override=model_config_override,
-                        )
-                        logger.info(
-                            f"Video generation started: token={token_tag}, post_id={post_id}, attempt={attempt}/{moderated_max_retry}"
-                        )
-                        async for line in stream_response:
-                            if self._is_moderated_line(line):
-                                moderated_hit = True
-                                logger.warning(
-                                    f"Video generation moderated: token={token_tag}, retry {attempt}/{moderated_max_retry}"
-                                )
-                                break
-                            yield line
-
-                    if not moderated_hit:
-                        return
-                    if attempt < moderated_max_retry:
-                        await asyncio.sleep(1.2)
-                        continue
-                    raise UpstreamException(
-                        "Video blocked by moderation",
-                        status_code=400,
-                        details={"moderated": True, "attempts": moderated_max_retry},
-                    )
-                except Exception as e:
-                    logger.error(f"Video generation error: {e}")
-                    if isinstance(e, AppException):
-                        raise
-                    msg, code, status = _classify_video_error(e)
-                    raise AppException(
-                        message=msg,
-                        error_type=ErrorType.SERVER.value if status >= 500 else ErrorType.INVALID_REQUEST.value,
-                        code=code,
-                        status_code=status,
-                    )
-                finally:
-                    try:
-                        await session.close()
-                    except Exception:
-                        pass
-
-        return _stream()
+        model_config_override = _build_video_model_config(
+            aspect_ratio, post_id, resolution_name, video_length
+        )
+        return self._run_video_stream(
+            token,
+            message,
+            model_config_override,
+            token_tag=token_tag,
+            collect_only=collect_only,
+            started_log=f"Video generation started: token={token_tag}, post_id={post_id}",
+        )
 
     async def generate_from_image(
         self,
@@ -356,7 +597,9 @@ class VideoService:
         video_length: int = 6,
         resolution: str = "480p",
         preset: str = "normal",
-    ) -> AsyncGenerator[bytes, None]:
+        *,
+        collect_only: bool = False,
+    ) -> AsyncGenerator[dict, None]:
         """Generate video from image."""
         token_tag = _token_tag(token)
         mode = (
@@ -365,7 +608,11 @@ class VideoService:
             else "extremely-spicy-or-crazy"
         )
         logger.info(
-            f"Image to video: token={token_tag}, prompt='{prompt[:50]}...', image={image_url[:80]}, mode={mode}"
+            "Image to video: token={}, prompt='{}...', image={}, mode={}",
+            token_tag,
+            prompt[:50],
+            image_url[:80],
+            mode,
         )
         post_id = await self.create_image_post(token, image_url)
         message = self._build_video_message(
@@ -373,73 +620,17 @@ class VideoService:
             preset=preset,
             source_image_url=image_url,
         )
-        model_config_override = {
-            "modelMap": {
-                "videoGenModelConfig": {
-                    "aspectRatio": aspect_ratio,
-                    "parentPostId": post_id,
-                    "resolutionName": resolution,
-                    "videoLength": video_length,
-                    "isVideoEdit": False,
-                }
-            }
-        }
-        moderated_max_retry = max(1, int(get_config("video.moderated_max_retry", 5)))
-
-        async def _stream():
-            for attempt in range(1, moderated_max_retry + 1):
-                session = AsyncSession()
-                moderated_hit = False
-                try:
-                    async with _get_video_semaphore():
-                        stream_response = await AppChatReverse.request(
-                            session,
-                            token,
-                            message=message,
-                            model="grok-3",
-                            tool_overrides={"videoGen": True},
-                            model_config_override=model_config_override,
-                        )
-                        logger.info(
-                            f"Video generation started: token={token_tag}, post_id={post_id}, attempt={attempt}/{moderated_max_retry}"
-                        )
-                        async for line in stream_response:
-                            if self._is_moderated_line(line):
-                                moderated_hit = True
-                                logger.warning(
-                                    f"Video generation moderated: token={token_tag}, retry {attempt}/{moderated_max_retry}"
-                                )
-                                break
-                            yield line
-
-                    if not moderated_hit:
-                        return
-                    if attempt < moderated_max_retry:
-                        await asyncio.sleep(1.2)
-                        continue
-                    raise UpstreamException(
-                        "Video blocked by moderation",
-                        status_code=400,
-                        details={"moderated": True, "attempts": moderated_max_retry},
-                    )
-                except Exception as e:
-                    logger.error(f"Video generation error: {e}")
-                    if isinstance(e, AppException):
-                        raise
-                    msg, code, status = _classify_video_error(e)
-                    raise AppException(
-                        message=msg,
-                        error_type=ErrorType.SERVER.value if status >= 500 else ErrorType.INVALID_REQUEST.value,
-                        code=code,
-                        status_code=status,
-                    )
-                finally:
-                    try:
-                        await session.close()
-                    except Exception:
-                        pass
-
-        return _stream()
+        model_config_override = _build_video_model_config(
+            aspect_ratio, post_id, resolution, video_length
+        )
+        return self._run_video_stream(
+            token,
+            message,
+            model_config_override,
+            token_tag=token_tag,
+            collect_only=collect_only,
+            started_log=f"Video generation started: token={token_tag}, post_id={post_id}",
+        )
 
     async def generate_from_parent_post(
         self,
@@ -451,7 +642,9 @@ class VideoService:
         video_length: int = 6,
         resolution: str = "480p",
         preset: str = "normal",
-    ) -> AsyncGenerator[bytes, None]:
+        *,
+        collect_only: bool = False,
+    ) -> AsyncGenerator[dict, None]:
         """Generate video by existing parent post ID (preferred path)."""
         token_tag = _token_tag(token)
         mode = (
@@ -460,15 +653,22 @@ class VideoService:
             else "extremely-spicy-or-crazy"
         )
         logger.info(
-            f"ParentPost to video: token={token_tag}, prompt='{prompt[:50]}...', parent_post_id={parent_post_id}"
+            "ParentPost to video: token={}, prompt='{}...', parent_post_id={}",
+            token_tag,
+            prompt[:50],
+            parent_post_id,
         )
         raw_source_image_url = (source_image_url or "").strip()
-        source_image_url = self._build_imagine_public_url(parent_post_id)
+        source_image_url = _IMAGINE_PUBLIC_IMAGE_PREFIX + parent_post_id + ".jpg"
         if raw_source_image_url and raw_source_image_url != source_image_url:
             logger.info(
-                "ParentPost source image normalized to imagine-public: "
-                f"token={token_tag}, parent_post_id={parent_post_id}, "
-                f"raw_source_image_url={raw_source_image_url}, normalized_source_image_url={source_image_url}"
+                "ParentPost source image normalized to imagine-public: token={}, "
+                "parent_post_id={}, raw_source_image_url={}, "
+                "normalized_source_image_url={}",
+                token_tag,
+                parent_post_id,
+                raw_source_image_url,
+                source_image_url,
             )
 
         # 对齐官网全链路：先创建 IMAGE 类型 media post，再触发 conversations/new。
@@ -476,14 +676,19 @@ class VideoService:
         try:
             created_image_post_id = await self.create_image_post(token, source_image_url)
             logger.info(
-                "ParentPost pre-create media post done: "
-                f"parent_post_id={parent_post_id}, image_post_id={created_image_post_id}, "
-                f"media_url={source_image_url}"
+                "ParentPost pre-create media post done: parent_post_id={}, "
+                "image_post_id={}, media_url={}",
+                parent_post_id,
+                created_image_post_id,
+                source_image_url,
             )
         except Exception as e:
             logger.warning(
-                "ParentPost pre-create media post failed, continue anyway: "
-                f"parent_post_id={parent_post_id}, media_url={source_image_url}, error={e}"
+                "ParentPost pre-create media post failed, "
+                "continue anyway: parent_post_id={}, media_url={}, error={}",
+                parent_post_id,
+                source_image_url,
+                e,
             )
 
         message = self._build_video_message(
@@ -491,81 +696,34 @@ class VideoService:
             preset=preset,
             source_image_url=source_image_url,
         )
-        model_config_override = {
-            "modelMap": {
-                "videoGenModelConfig": {
-                    "aspectRatio": aspect_ratio,
-                    "parentPostId": parent_post_id,
-                    "resolutionName": resolution,
-                    "videoLength": video_length,
-                    "isVideoEdit": False,
-                }
-            }
-        }
-        moderated_max_retry = max(1, int(get_config("video.moderated_max_retry", 5)))
-
+        model_config_override = _build_video_model_config(
+            aspect_ratio, parent_post_id, resolution, video_length
+        )
         logger.info(
-            "ParentPost video request prepared: "
-            f"token={token_tag}, parent_post_id={parent_post_id}, "
-            f"message_len={len(message)}, has_prompt={bool((prompt or '').strip())}, "
-            f"resolution={resolution}, video_length={video_length}, ratio={aspect_ratio}, mode={mode}"
+            "ParentPost video request prepared: token={}, parent_post_id={}, "
+            "message_len={}, has_prompt={}, resolution={}, video_length={}, ratio={}, "
+            "mode={}",
+            token_tag,
+            parent_post_id,
+            len(message),
+            bool((prompt or '').strip()),
+            resolution,
+            video_length,
+            aspect_ratio,
+            mode,
         )
 
-        async def _stream():
-            for attempt in range(1, moderated_max_retry + 1):
-                session = AsyncSession()
-                moderated_hit = False
-                try:
-                    async with _get_video_semaphore():
-                        stream_response = await AppChatReverse.request(
-                            session,
-                            token,
-                            message=message,
-                            model="grok-3",
-                            tool_overrides={"videoGen": True},
-                            model_config_override=model_config_override,
-                        )
-                        logger.info(
-                            "Video generation started by parentPostId: "
-                            f"token={token_tag}, parent_post_id={parent_post_id}, attempt={attempt}/{moderated_max_retry}"
-                        )
-                        async for line in stream_response:
-                            if self._is_moderated_line(line):
-                                moderated_hit = True
-                                logger.warning(
-                                    f"Video generation moderated: token={token_tag}, retry {attempt}/{moderated_max_retry}"
-                                )
-                                break
-                            yield line
-
-                    if not moderated_hit:
-                        return
-                    if attempt < moderated_max_retry:
-                        await asyncio.sleep(1.2)
-                        continue
-                    raise UpstreamException(
-                        "Video blocked by moderation",
-                        status_code=400,
-                        details={"moderated": True, "attempts": moderated_max_retry},
-                    )
-                except Exception as e:
-                    logger.error(f"Video generation error: {e}")
-                    if isinstance(e, AppException):
-                        raise
-                    msg, code, status = _classify_video_error(e)
-                    raise AppException(
-                        message=msg,
-                        error_type=ErrorType.SERVER.value if status >= 500 else ErrorType.INVALID_REQUEST.value,
-                        code=code,
-                        status_code=status,
-                    )
-                finally:
-                    try:
-                        await session.close()
-                    except Exception:
-                        pass
-
-        return _stream()
+        return self._run_video_stream(
+            token,
+            message,
+            model_config_override,
+            token_tag=token_tag,
+            collect_only=collect_only,
+            started_log=(
+                "Video generation started by parentPostId: "
+                f"token={token_tag}, parent_post_id={parent_post_id}"
+            ),
+        )
 
     @staticmethod
     async def completions(
@@ -586,14 +744,15 @@ class VideoService:
         token_mgr = await get_token_manager()
         await token_mgr.reload_if_stale()
 
-        max_token_retries = int(get_config("retry.max_retry"))
+        video_cfg = _video_cfg()
+        max_token_retries = video_cfg.max_token_retries
         last_error: Exception | None = None
 
         if reasoning_effort is None:
-            show_think = get_config("app.thinking")
+            show_think = video_cfg.default_think
         else:
             show_think = reasoning_effort != "none"
-        is_stream = stream if stream is not None else get_config("app.stream")
+        is_stream = stream if stream is not None else video_cfg.default_stream
 
         # Extract content.
         from app.services.grok.services.chat import MessageExtractor
@@ -605,7 +764,8 @@ class VideoService:
         preferred_token = (preferred_token or "").strip()
         if preferred_token.startswith("sso="):
             preferred_token = preferred_token[4:]
-        used_tokens: set[str] = set()
+        # 重试次数很少（通常 < 10），用列表记录已用 token，membership 线性探测即可
+        used_tokens: list[str] = []
 
         for attempt in range(max_token_retries):
             token = ""
@@ -613,14 +773,15 @@ class VideoService:
                 if token_mgr.get_pool_name_for_token(preferred_token):
                     token = preferred_token
                     logger.info(
-                        f"Video token routing: preferred bound token -> "
-                        f"token={_token_tag(token)}"
+                        "Video token routing: preferred bound token -> token={}",
+                        _token_tag(token),
                     )
                 else:
-                    used_tokens.add(preferred_token)
+                    used_tokens.append(preferred_token)
                     logger.warning(
-                        f"Video token routing: preferred token not in pool, fallback to normal routing "
-                        f"(token={_token_tag(preferred_token)})"
+                        "Video token routing: preferred token not in pool, "
+                        "fallback to normal routing (token={})",
+                        _token_tag(preferred_token),
                     )
 
             if not token:
@@ -647,8 +808,9 @@ class VideoService:
                 if token.startswith("sso="):
                     token = token[4:]
 
-            used_tokens.add(token)
-            should_upscale = bool(get_config("video.auto_upscale", True))
+            if token not in used_tokens:
+                used_tokens.append(token)
+            should_upscale = video_cfg.auto_upscale
 
             try:
                 # Handle image attachments.
@@ -661,7 +823,7 @@ class VideoService:
                                 attach_data, token
                             )
                             image_url = f"https://assets.grok.com/{file_uri}"
-                            logger.info(f"Image uploaded for video: {image_url}")
+                            logger.info("Image uploaded for video: {}", image_url)
                             break
                     finally:
                         await upload_service.close()
@@ -678,6 +840,7 @@ class VideoService:
                         video_length=video_length,
                         resolution=resolution,
                         preset=preset,
+                        collect_only=not is_stream,
                     )
                 elif image_url:
                     response = await service.generate_from_image(
@@ -688,6 +851,7 @@ class VideoService:
                         video_length,
                         resolution,
                         preset,
+                        collect_only=not is_stream,
                     )
                 else:
                     response = await service.generate(
@@ -697,6 +861,7 @@ class VideoService:
                         video_length,
                         resolution,
                         preset,
+                        collect_only=not is_stream,
                     )
 
                 # Process response.
@@ -723,10 +888,11 @@ class VideoService:
                     )
                     await token_mgr.consume(token, effort)
                     logger.debug(
-                        f"Video completed, recorded usage (effort={effort.value})"
+                        "Video completed, recorded usage (effort={})",
+                        effort.value,
                     )
                 except Exception as e:
-                    logger.warning(f"Failed to record video usage: {e}")
+                    logger.warning("Failed to record video usage: {}", e)
                 return result
 
             except UpstreamException as e:
@@ -734,8 +900,11 @@ class VideoService:
                 if rate_limited(e):
                     await token_mgr.mark_rate_limited(token)
                     logger.warning(
-                        f"Token {_token_tag(token)} rate limited (429), "
-                        f"trying next token (attempt {attempt + 1}/{max_token_retries})"
+                        "Token {} rate limited (429), "
+                        "trying next token (attempt {}/{})",
+                        _token_tag(token),
+                        attempt + 1,
+                        max_token_retries,
                     )
                     continue
                 msg, code, status = _classify_video_error(e)
@@ -770,45 +939,61 @@ class VideoStreamProcessor(BaseProcessor):
         self.response_id: Optional[str] = None
         self.think_opened: bool = False
         self.role_sent: bool = False
+        # 内容帧前缀缓存（随 response_id 变化重建）
+        self._content_prefix: bytes = b""
+        self._content_prefix_id: Optional[str] = None
 
         self.show_think = bool(show_think)
         self.upscale_on_finish = bool(upscale_on_finish)
 
-    @staticmethod
-    def _extract_video_id(video_url: str) -> str:
-        if not video_url:
-            return ""
-        match = re.search(r"/generated/([0-9a-fA-F-]{32,36})/", video_url)
-        if match:
-            return match.group(1)
-        match = re.search(r"/([0-9a-fA-F-]{32,36})/generated_video", video_url)
-        if match:
-            return match.group(1)
-        return ""
-
     async def _upscale_video_url(self, video_url: str) -> str:
         if not video_url or not self.upscale_on_finish:
             return video_url
-        video_id = self._extract_video_id(video_url)
+        video_id = _extract_video_id(video_url)
         if not video_id:
             logger.warning("Video upscale skipped: unable to extract video id")
             return video_url
+        response = None
         try:
-            async with AsyncSession() as session:
-                response = await VideoUpscaleReverse.request(
-                    session, self.token, video_id
-                )
-            payload = response.json() if response is not None else {}
-            hd_url = payload.get("hdMediaUrl") if isinstance(payload, dict) else None
+            response = await VideoUpscaleReverse.request(
+                _get_video_session(), self.token, video_id
+            )
+            # 超分接口固定返回 JSON 对象；异常结构由外层 except 兜底
+            payload = response.json() if response is not None else None
+            hd_url = payload.get("hdMediaUrl") if payload else None
             if hd_url:
-                logger.info(f"Video upscale completed: {hd_url}")
+                logger.info("Video upscale completed: {}", hd_url)
                 return hd_url
         except Exception as e:
-            logger.warning(f"Video upscale failed: {e}")
+            logger.warning("Video upscale failed: {}", e)
+        finally:
+            await _close_response(response)
         return video_url
 
-    def _sse(self, content: str = "", role: str = None, finish: str = None) -> str:
-        """Build SSE response."""
+    def _sse(self, content: str = "", role: str = None, finish: str = None) -> bytes:
+        """Build SSE response (bytes, written to the wire as-is)."""
+        if not self.response_id:
+            # 上游尚未给出 responseId 时生成一次并缓存，整条流复用同一个 ID
+            self.response_id = f"chatcmpl-{os.urandom(12).hex()}"
+        if content and not role and not finish:
+            # 内容帧只有 content 不同：拼接预生成的前缀/后缀，只序列化 content
+            if self._content_prefix_id != self.response_id:
+                self._content_prefix = (
+                    b'data: {"id":'
+                    + orjson.dumps(self.response_id)
+                    + b',"object":"chat.completion.chunk","created":'
+                    + orjson.dumps(self.created)
+                    + b',"model":'
+                    + orjson.dumps(self.model)
+                    + b',"choices":[{"index":0,"delta":{"content":'
+                )
+                self._content_prefix_id = self.response_id
+            return (
+                self._content_prefix
+                + orjson.dumps(content)
+                + _CONTENT_FRAME_SUFFIX
+            )
+
         delta = {}
         if role:
             delta["role"] = role
@@ -817,7 +1002,7 @@ class VideoStreamProcessor(BaseProcessor):
             delta["content"] = content
 
         chunk = {
-            "id": self.response_id or f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "id": self.response_id,
             "object": "chat.completion.chunk",
             "created": self.created,
             "model": self.model,
@@ -825,89 +1010,113 @@ class VideoStreamProcessor(BaseProcessor):
                 {"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish}
             ],
         }
-        return f"data: {orjson.dumps(chunk).decode()}\n\n"
+        return b"data: " + orjson.dumps(chunk) + b"\n\n"
+
+    def _think_transition(self, is_thinking: bool) -> Optional[bytes]:
+        """切换 think 状态，返回需先发送的开/闭标签帧；状态不变时返回 None。"""
+        if is_thinking == self.think_opened:
+            return None
+        self.think_opened = is_thinking
+        return self._sse("<think>\n" if is_thinking else "\n</think>\n")
+
+    async def _render_finished(self, video_resp: dict) -> AsyncGenerator[bytes, None]:
+        """进度 100% 时输出视频（按需超分）；每条流只会触发一次。"""
+        video_url = video_resp.get("videoUrl", "")
+        if not video_url:
+            return
+        if self.upscale_on_finish:
+            yield self._sse("正在对视频进行超分辨率\n")
+            video_url = await self._upscale_video_url(video_url)
+        dl_service = self._get_dl()
+        rendered = await dl_service.render_video(
+            video_url, self.token, video_resp.get("thumbnailImageUrl", "")
+        )
+        yield self._sse(rendered)
+
+        logger.info("Video generated: {}", video_url)
 
     async def process(
-        self, response: AsyncIterable[bytes]
-    ) -> AsyncGenerator[str, None]:
-        """Process video stream response."""
-        idle_timeout = get_config("video.stream_timeout")
+        self, response: AsyncIterable[dict]
+    ) -> AsyncGenerator[bytes, None]:
+        """Process video stream response (parsed upstream objects)."""
+        idle_timeout = _video_cfg().stream_timeout
 
         try:
-            async for line in _with_idle_timeout(response, idle_timeout, self.model):
-                line = _normalize_line(line)
-                if not line:
-                    continue
-                try:
-                    data = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
-                resp = data.get("result", {}).get("response", {})
-                is_thinking = bool(resp.get("isThinking"))
-
-                if rid := resp.get("responseId"):
-                    self.response_id = rid
-
-                if not self.role_sent:
-                    yield self._sse(role="assistant")
-                    self.role_sent = True
-
-                if token := resp.get("token"):
-                    if is_thinking:
-                        if not self.show_think:
-                            continue
-                        if not self.think_opened:
-                            yield self._sse("<think>\n")
-                            self.think_opened = True
+            stream = _with_idle_timeout(response, idle_timeout, self.model)
+            # 热循环内频繁调用的绑定方法先取到局部变量，省去逐帧属性查找
+            sse = self._sse
+            think_transition = self._think_transition
+            # 同一条上游消息产生的多个帧（role 头、think 标签、正文）合并为一次 yield，
+            # 减少经过 ASGI 的写次数；跨消息不做缓冲，以免进度帧被延迟
+            if not self.show_think:
+                # 不展示思考过程（常见配置）：思考帧直接跳过，不输出进度文本，
+                # think 标签永远不会打开，循环内无需任何 think 状态判断
+                async for data in stream:
+                    resp = data.get("result", {}).get("response", {})
+
+                    if rid := resp.get("responseId"):
+                        self.response_id = rid
+
+                    out = b""
+                    if not self.role_sent:
+                        out = sse(role="assistant")
+                        self.role_sent = True
+
+                    if token := resp.get("token"):
+                        if not resp.get("isThinking"):
+                            out += sse(token)
                     else:
-                        if self.think_opened:
-                            yield self._sse("\n</think>\n")
-                            self.think_opened = False
-                    yield self._sse(token)
-                    continue
-
-                if video_resp := resp.get("streamingVideoGenerationResponse"):
-                    progress = video_resp.get("progress", 0)
-
-                    if is_thinking:
-                        if not self.show_think:
-                            continue
-                        if not self.think_opened:
-                            yield self._sse("<think>\n")
-                            self.think_opened = True
-                    else:
-                        if self.think_opened:
-                            yield self._sse("\n</think>\n")
-                            self.think_opened = False
-                    if self.show_think:
-                        yield self._sse(f"正在生成视频中，当前进度{progress}%\n")
-
-                    if progress == 100:
-                        video_url = video_resp.get("videoUrl", "")
-                        thumbnail_url = video_resp.get("thumbnailImageUrl", "")
-
-                        if self.think_opened:
-                            yield self._sse("\n</think>\n")
-                            self.think_opened = False
-
-                        if video_url:
-                            if self.upscale_on_finish:
-                                yield self._sse("正在对视频进行超分辨率\n")
-                                video_url = await self._upscale_video_url(video_url)
-                            dl_service = self._get_dl()
-                            rendered = await dl_service.render_video(
-                                video_url, self.token, thumbnail_url
-                            )
-                            yield self._sse(rendered)
-
-                            logger.info(f"Video generated: {video_url}")
-                    continue
-
-            if self.think_opened:
-                yield self._sse("</think>\n")
-            yield self._sse(finish="stop")
-            yield "data: [DONE]\n\n"
+                        video_resp = resp.get("streamingVideoGenerationResponse")
+                        if (
+                            video_resp
+                            and video_resp.get("progress", 0) == 100
+                            and not resp.get("isThinking")
+                        ):
+                            if out:
+                                yield out
+                                out = b""
+                            async for frame in self._render_finished(video_resp):
+                                yield frame
+
+                    if out:
+                        yield out
+            else:
+                async for data in stream:
+                    resp = data.get("result", {}).get("response", {})
+
+                    if rid := resp.get("responseId"):
+                        self.response_id = rid
+
+                    out = b""
+                    if not self.role_sent:
+                        out = sse(role="assistant")
+                        self.role_sent = True
+
+                    # 最常见的 token 帧优先判断；isThinking 只在有内容的帧上读取
+                    if token := resp.get("token"):
+                        if frame := think_transition(bool(resp.get("isThinking"))):
+                            out += frame
+                        out += sse(token)
+                    elif video_resp := resp.get("streamingVideoGenerationResponse"):
+                        progress = video_resp.get("progress", 0)
+
+                        if frame := think_transition(bool(resp.get("isThinking"))):
+                            out += frame
+                        out += sse(f"正在生成视频中，当前进度{progress}%\n")
+
+                        if progress == 100:
+                            if frame := think_transition(False):
+                                out += frame
+                            yield out
+                            out = b""
+                            async for frame in self._render_finished(video_resp):
+                                yield frame
+
+                    if out:
+                        yield out
+
+            out = sse("</think>\n") if self.think_opened else b""
+            yield out + sse(finish="stop") + b"data: [DONE]\n\n"
         except asyncio.CancelledError:
             logger.debug(
                 "Video stream cancelled by client", extra={"model": self.model}
@@ -922,7 +1131,9 @@ class VideoStreamProcessor(BaseProcessor):
         except RequestsError as e:
             if _is_http2_error(e):
                 logger.warning(
-                    f"HTTP/2 stream error in video: {e}", extra={"model": self.model}
+                    "HTTP/2 stream error in video: {}",
+                    e,
+                    extra={"model": self.model},
                 )
                 raise AppException(
                     message="视频生成失败：网络连接异常，请稍后重试",
@@ -931,7 +1142,9 @@ class VideoStreamProcessor(BaseProcessor):
                     status_code=502,
                 )
             logger.error(
-                f"Video stream request error: {e}", extra={"model": self.model}
+                "Video stream request error: {}",
+                e,
+                extra={"model": self.model},
             )
             raise AppException(
                 message="视频生成失败：网络连接异常，请稍后重试",
@@ -941,7 +1154,8 @@ class VideoStreamProcessor(BaseProcessor):
             )
         except Exception as e:
             logger.error(
-                f"Video stream processing error: {e}",
+                "Video stream processing error: {}",
+                e,
                 extra={"model": self.model, "error_type": type(e).__name__},
             )
             msg, code, status = _classify_video_error(e)
@@ -962,37 +1176,28 @@ class VideoCollectProcessor(BaseProcessor):
         super().__init__(model, token)
         self.upscale_on_finish = bool(upscale_on_finish)
 
-    @staticmethod
-    def _extract_video_id(video_url: str) -> str:
-        if not video_url:
-            return ""
-        match = re.search(r"/generated/([0-9a-fA-F-]{32,36})/", video_url)
-        if match:
-            return match.group(1)
-        match = re.search(r"/([0-9a-fA-F-]{32,36})/generated_video", video_url)
-        if match:
-            return match.group(1)
-        return ""
-
     async def _upscale_video_url(self, video_url: str) -> str:
         if not video_url or not self.upscale_on_finish:
             return video_url
-        video_id = self._extract_video_id(video_url)
+        video_id = _extract_video_id(video_url)
         if not video_id:
             logger.warning("Video upscale skipped: unable to extract video id")
             return video_url
+        response = None
         try:
-            async with AsyncSession() as session:
-                response = await VideoUpscaleReverse.request(
-                    session, self.token, video_id
-                )
-            payload = response.json() if response is not None else {}
-            hd_url = payload.get("hdMediaUrl") if isinstance(payload, dict) else None
+            response = await VideoUpscaleReverse.request(
+                _get_video_session(), self.token, video_id
+            )
+            # 超分接口固定返回 JSON 对象；异常结构由外层 except 兜底
+            payload = response.json() if response is not None else None
+            hd_url = payload.get("hdMediaUrl") if payload else None
             if hd_url:
-                logger.info(f"Video upscale completed: {hd_url}")
+                logger.info("Video upscale completed: {}", hd_url)
                 return hd_url
         except Exception as e:
-            logger.warning(f"Video upscale failed: {e}")
+            logger.warning("Video upscale failed: {}", e)
+        finally:
+            await _close_response(response)
         return video_url
 
     async def _resolve_video_asset_path(self, asset_id: str) -> tuple[str, str]:
@@ -1005,98 +1210,119 @@ class VideoCollectProcessor(BaseProcessor):
         page_size = 50
         max_pages = 20
         marker = f"/{asset_id}/"
-
-        async with AsyncSession() as session:
-            for attempt in range(1, retries + 1):
-                params = {
-                    "pageSize": page_size,
-                    "orderBy": "ORDER_BY_LAST_USE_TIME",
-                    "source": "SOURCE_ANY",
-                    "isLatest": "true",
-                }
-                page_token = ""
-                page_count = 0
-                try:
-                    while True:
-                        if page_token:
-                            params["pageToken"] = page_token
-                        else:
-                            params.pop("pageToken", None)
-
-                        response = await AssetsListReverse.request(
-                            session, self.token, params
-                        )
+        content_suffix = f"{asset_id}/content"
+
+        # 复用进程内共享会话，翻页与重试不再各自建立连接
+        session = _get_video_session()
+        base_params = {
+            "pageSize": page_size,
+            "orderBy": "ORDER_BY_LAST_USE_TIME",
+            "source": "SOURCE_ANY",
+            "isLatest": "true",
+        }
+        for attempt in range(1, retries + 1):
+            page_count = 0
+            page_task = asyncio.create_task(
+                AssetsListReverse.request(session, self.token, dict(base_params))
+            )
+            try:
+                while page_task is not None:
+                    response = await page_task
+                    page_task = None
+                    try:
                         data = response.json() if response is not None else {}
-                        assets = data.get("assets", []) if isinstance(data, dict) else []
+                    finally:
+                        # 本页内容已解析完毕，立即释放响应
+                        await _close_response(response)
+                    assets = data.get("assets", []) if isinstance(data, dict) else []
+
+                    # 拿到下一页 token 后立即预取下一页，扫描当前页与网络往返重叠；
+                    # 命中或出错时在 finally 中取消预取
+                    page_token = str(data.get("nextPageToken", "")).strip()
+                    page_count += 1
+                    if page_token and page_count < max_pages:
+                        page_task = asyncio.create_task(
+                            AssetsListReverse.request(
+                                session,
+                                self.token,
+                                {**base_params, "pageToken": page_token},
+                            )
+                        )
 
-                        for asset in assets:
-                            if not isinstance(asset, dict):
-                                continue
-                            current_asset_id = str(asset.get("assetId", "")).strip()
-                            key = str(asset.get("key", "")).strip()
-                            mime_type = str(asset.get("mimeType", "")).lower()
-                            if (
-                                current_asset_id == asset_id
-                                or marker in key
-                                or key.endswith(f"{asset_id}/content")
-                            ):
-                                if mime_type.startswith("video/") or "generated_video" in key:
-                                    preview_key = str(asset.get("previewImageKey", "")).strip()
-                                    if not preview_key:
-                                        aux = asset.get("auxKeys") or {}
-                                        if isinstance(aux, dict):
-                                            preview_key = str(aux.get("preview-image", "")).strip()
-                                    logger.info(
-                                        "Video asset resolved by assets list: "
-                                        f"asset_id={asset_id}, key={key}, preview={preview_key}"
-                                    )
-                                    return key, preview_key
-
-                        page_token = str(data.get("nextPageToken", "")).strip()
-                        page_count += 1
-                        if not page_token or page_count >= max_pages:
-                            break
-                except Exception as e:
-                    logger.warning(
-                        f"Video asset resolve failed (attempt={attempt}/{retries}): {e}"
-                    )
+                    for asset in assets:
+                        if not isinstance(asset, dict):
+                            continue
+                        # 上游字段本身就是字符串：直接比较原值，不再逐个 str()/strip()；
+                        # 先做 ID 等值比较，再做子串匹配，未命中的资产不再读取 mimeType
+                        key = asset.get("key") or ""
+                        if not isinstance(key, str):
+                            continue
+                        if (
+                            asset.get("assetId") == asset_id
+                            or marker in key
+                            or key.endswith(content_suffix)
+                        ):
+                            key = key.strip()
+                            mime_type = asset.get("mimeType") or ""
+                            if not isinstance(mime_type, str):
+                                mime_type = ""
+                            if mime_type.lower().startswith("video/") or "generated_video" in key:
+                                preview_key = str(asset.get("previewImageKey", "")).strip()
+                                if not preview_key:
+                                    aux = asset.get("auxKeys") or {}
+                                    if isinstance(aux, dict):
+                                        preview_key = str(aux.get("preview-image", "")).strip()
+                                logger.info(
+                                    "Video asset resolved by assets list: asset_id={}, "
+                                    "key={}, preview={}",
+                                    asset_id,
+                                    key,
+                                    preview_key,
+                                )
+                                return key, preview_key
+            except Exception as e:
+                logger.warning(
+                    "Video asset resolve failed (attempt={}/{}): {}",
+                    attempt,
+                    retries,
+                    e,
+                )
+            finally:
+                if page_task is not None:
+                    if page_task.done() and not page_task.cancelled():
+                        # 已完成的预取需取走结果，避免未读取异常的告警；成功的响应同样显式释放
+                        if page_task.exception() is None:
+                            await _close_response(page_task.result())
+                    else:
+                        page_task.cancel()
 
-                if attempt < retries:
-                    await asyncio.sleep(delay)
+            if attempt < retries:
+                await asyncio.sleep(delay)
 
         return "", ""
 
-    async def process(self, response: AsyncIterable[bytes]) -> dict[str, Any]:
-        """Process and collect video response."""
+    async def process(self, response: AsyncIterable[dict]) -> dict[str, Any]:
+        """Process and collect video response (parsed upstream objects)."""
         response_id = ""
         content = ""
-        fallback_video_id = ""
-        fallback_thumb = ""
-        idle_timeout = get_config("video.stream_timeout")
+        # 兜底用的视频 ID 来源：最近一个带 ID 的视频帧（原样保存），
+        # 或 modelResponse 中的附件 ID；只在真正需要兜底时才转换
+        fallback_src: Any = None
+        fallback_thumb: Any = ""
+        idle_timeout = _video_cfg().stream_timeout
 
         try:
-            async for line in _with_idle_timeout(response, idle_timeout, self.model):
-                line = _normalize_line(line)
-                if not line:
-                    continue
-                try:
-                    data = orjson.loads(line)
-                except orjson.JSONDecodeError:
-                    continue
-
+            async for data in _with_idle_timeout(response, idle_timeout, self.model):
                 resp = data.get("result", {}).get("response", {})
 
                 if video_resp := resp.get("streamingVideoGenerationResponse"):
-                    fallback_video_id = (
-                        str(video_resp.get("videoPostId", "")).strip()
-                        or str(video_resp.get("assetId", "")).strip()
-                        or str(video_resp.get("videoId", "")).strip()
-                        or fallback_video_id
-                    )
-                    thumb_from_stream = str(
-                        video_resp.get("thumbnailImageUrl", "")
-                    ).strip()
-                    if thumb_from_stream:
+                    if (
+                        video_resp.get("videoPostId")
+                        or video_resp.get("assetId")
+                        or video_resp.get("videoId")
+                    ):
+                        fallback_src = video_resp
+                    if thumb_from_stream := video_resp.get("thumbnailImageUrl"):
                         fallback_thumb = thumb_from_stream
 
                     if video_resp.get("progress") == 100:
@@ -1111,14 +1337,14 @@ class VideoCollectProcessor(BaseProcessor):
                             content = await dl_service.render_video(
                                 video_url, self.token, thumbnail_url
                             )
-                            logger.info(f"Video generated: {video_url}")
+                            logger.info("Video generated: {}", video_url)
                 elif model_resp := resp.get("modelResponse"):
                     file_attachments = model_resp.get("fileAttachments", [])
                     if isinstance(file_attachments, list):
                         for fid in file_attachments:
                             fid = str(fid).strip()
                             if fid:
-                                fallback_video_id = fid
+                                fallback_src = fid
                                 break
 
         except asyncio.CancelledError:
@@ -1127,17 +1353,22 @@ class VideoCollectProcessor(BaseProcessor):
             )
         except StreamIdleTimeoutError as e:
             logger.warning(
-                f"Video collect idle timeout: {e}", extra={"model": self.model}
+                "Video collect idle timeout: {}",
+                e,
+                extra={"model": self.model},
             )
         except RequestsError as e:
             if _is_http2_error(e):
                 logger.warning(
-                    f"HTTP/2 stream error in video collect: {e}",
+                    "HTTP/2 stream error in video collect: {}",
+                    e,
                     extra={"model": self.model},
                 )
             else:
                 logger.error(
-                    f"Video collect request error: {e}", extra={"model": self.model}
+                    "Video collect request error: {}",
+                    e,
+                    extra={"model": self.model},
                 )
         except UpstreamException as e:
             # 对于上游明确返回的业务终止错误（如 moderation 封禁），
@@ -1148,23 +1379,27 @@ class VideoCollectProcessor(BaseProcessor):
             )
             if is_moderated_block:
                 logger.error(
-                    f"Video collect got terminal moderation error: {e}",
+                    "Video collect got terminal moderation error: {}",
+                    e,
                     extra={"model": self.model},
                 )
                 raise
             logger.error(
-                f"Video collect upstream error: {e}",
+                "Video collect upstream error: {}",
+                e,
                 extra={"model": self.model, "error_type": type(e).__name__},
             )
         except Exception as e:
             logger.error(
-                f"Video collect processing error: {e}",
+                "Video collect processing error: {}",
+                e,
                 extra={"model": self.model, "error_type": type(e).__name__},
             )
         finally:
             await self.close()
 
-        if not content and fallback_video_id:
+        fallback_video_id = "" if content else _fallback_video_id(fallback_src)
+        if fallback_video_id:
             asset_video_path, asset_thumb_path = await self._resolve_video_asset_path(
                 fallback_video_id
             )
@@ -1173,12 +1408,15 @@ class VideoCollectProcessor(BaseProcessor):
                     asset_video_path = await self._upscale_video_url(asset_video_path)
                 dl_service = self._get_dl()
                 content = await dl_service.render_video(
-                    asset_video_path, self.token, asset_thumb_path or fallback_thumb
+                    asset_video_path,
+                    self.token,
+                    asset_thumb_path or str(fallback_thumb).strip(),
                 )
-                response_id = response_id or f"chatcmpl-{uuid.uuid4().hex[:24]}"
+                response_id = response_id or f"chatcmpl-{os.urandom(12).hex()}"
                 logger.info(
-                    "Video generated via assets fallback: "
-                    f"video_id={fallback_video_id}, key={asset_video_path}"
+                    "Video generated via assets fallback: video_id={}, key={}",
+                    fallback_video_id,
+                    asset_video_path,
                 )
 
         return {
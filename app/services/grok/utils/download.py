@@ -18,11 +18,21 @@ from curl_cffi.requests import AsyncSession
 from app.core.logger import logger
 from app.core.storage import DATA_DIR
 from app.core.config import get_config
-from app.core.exceptions import AppException
+from app.core.exceptions import AppException, UnsupportedContentError
 from app.services.reverse.assets_download import AssetsDownloadReverse
 from app.services.grok.utils.locks import _get_download_semaphore, _file_lock
 
 
+# 超过该字节数的 base64 编码在线程池中执行
+B64_OFFLOAD_THRESHOLD = 64 * 1024
+
+# 流式编码时每次编码的最小批量（字节）
+B64_ENCODE_BATCH = 192 * 1024
+
+# 资产下载中不可能是媒体文件的响应类型
+_UNSUPPORTED_CONTENT_PREFIXES = ("text/", "application/json")
+
+
 class DownloadService:
     """Assets download service."""
 
@@ -123,6 +133,13 @@ class DownloadService:
 
     async def parse_b64(self, file_path: str, token: str, media_type: str = "image") -> str:
         """Download and return data URI."""
+        b64, content_type = await self.fetch_b64(file_path, token, media_type)
+        return f"data:{content_type};base64,{b64}"
+
+    async def fetch_b64(
+        self, file_path: str, token: str, media_type: str = "image"
+    ) -> Tuple[str, str]:
+        """Download and return (base64 body, MIME type) without the data URI header."""
         try:
             if not isinstance(file_path, str) or not file_path.strip():
                 raise AppException("Invalid file path", code="invalid_file_path")
@@ -141,21 +158,50 @@ class DownloadService:
                         session, token, file_path
                     )
 
+            content_type = response.headers.get(
+                "content-type", "application/octet-stream"
+            ).split(";")[0]
+            # 读取正文前先按响应头判定，挑战页/错误 JSON 无需下载完整内容
+            if content_type.startswith(_UNSUPPORTED_CONTENT_PREFIXES):
+                # 流式响应的正文不会再读取，需显式关闭以归还连接
+                close_fn = getattr(response, "aclose", None)
+                if callable(close_fn):
+                    try:
+                        await close_fn()
+                    except Exception:
+                        pass
+                raise UnsupportedContentError(content_type)
+
             if hasattr(response, "aiter_content"):
-                data = bytearray()
+                # 边下载边编码：攒够一批后按 3 字节对齐编码，只保留编码结果，
+                # 每批编码耗时很短，不会长时间占用事件循环
+                parts: List[bytes] = []
+                pending: List[bytes] = []
+                pending_len = 0
                 async for chunk in response.aiter_content():
-                    if chunk:
-                        data.extend(chunk)
-                raw = bytes(data)
+                    if not chunk:
+                        continue
+                    pending.append(chunk)
+                    pending_len += len(chunk)
+                    if pending_len < B64_ENCODE_BATCH:
+                        continue
+                    block = b"".join(pending)
+                    cut = pending_len - pending_len % 3
+                    parts.append(base64.b64encode(memoryview(block)[:cut]))
+                    pending = [block[cut:]]
+                    pending_len -= cut
+                if pending_len:
+                    parts.append(base64.b64encode(b"".join(pending)))
+                encoded = b"".join(parts)
             else:
                 raw = response.content
+                if len(raw) >= B64_OFFLOAD_THRESHOLD:
+                    # 大文件编码放到线程池，避免阻塞事件循环
+                    encoded = await asyncio.to_thread(base64.b64encode, raw)
+                else:
+                    encoded = base64.b64encode(raw)
 
-            content_type = response.headers.get(
-                "content-type", "application/octet-stream"
-            ).split(";")[0]
-            data_uri = f"data:{content_type};base64,{base64.b64encode(raw).decode()}"
-
-            return data_uri
+            return encoded.decode(), content_type
         except Exception as e:
             logger.error(f"Failed to convert {file_path} to base64: {e}")
             raise
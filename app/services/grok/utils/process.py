@@ -39,6 +39,23 @@ def _normalize_line(line: Any) -> Optional[str]:
     return text
 
 
+def _normalize_line_bytes(line: Any) -> Optional[bytes]:
+    """规范化流式响应行（bytes 版本），省去 UTF-8 解码，结果可直接交给 orjson"""
+    if line is None:
+        return None
+    if isinstance(line, str):
+        line = line.encode("utf-8", errors="ignore")
+    raw = line.strip()
+    if not raw:
+        return None
+    if raw.startswith(b"data:"):
+        # 行尾已去过空白，只需去掉前缀后的前导空白
+        raw = raw[5:].lstrip()
+    if not raw or raw == b"[DONE]":
+        return None
+    return raw
+
+
 def _collect_images(obj: Any) -> List[str]:
     """递归收集响应中的图片 URL"""
     urls: List[str] = []
@@ -147,6 +164,7 @@ __all__ = [
     "BaseProcessor",
     "_with_idle_timeout",
     "_normalize_line",
+    "_normalize_line_bytes",
     "_collect_images",
     "_is_http2_error",
 ]
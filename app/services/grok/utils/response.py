@@ -4,7 +4,6 @@ Response formatting utilities for OpenAI-compatible API responses.
 
 import os
 import time
-import uuid
 from typing import Optional
 
 
@@ -86,7 +85,7 @@ def make_chat_response(
         Chat completion response dict
     """
     if response_id is None:
-        response_id = f"chatcmpl-{uuid.uuid4().hex[:8]}"
+        response_id = f"chatcmpl-{os.urandom(4).hex()}"
 
     if usage is None:
         usage = {
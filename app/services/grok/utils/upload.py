@@ -4,16 +4,19 @@ Upload service.
 Upload service for assets.grok.com.
 """
 
+import asyncio
 import base64
 import hashlib
 import io
 import mimetypes
+import mmap
+import os
 import re
 from pathlib import Path
-from typing import AsyncIterator, Optional, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 from urllib.parse import urlparse
 
-import aiofiles
+from curl_cffi import CurlOpt
 from curl_cffi.requests import AsyncSession
 
 from app.core.config import get_config
@@ -24,24 +27,93 @@ from app.services.reverse.assets_upload import AssetsUploadReverse
 from app.services.grok.utils.locks import _get_upload_semaphore, _file_lock
 
 
+# base64 内容中的空白（data URI 可能按行折断）
+_WHITESPACE_RE = re.compile(r"\s+")
+_ASCII_WHITESPACE = " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+_ASCII_WHITESPACE_BYTES = _ASCII_WHITESPACE.encode()
+
+# 上传涉及的常见媒体后缀
+_EXT_MIME = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".mp4": "video/mp4",
+}
+
+# 本地缓存图片按后缀取类型，未知后缀按 JPEG 处理
+_LOCAL_IMAGE_MIME = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+# 超过该字节数的 base64 编码在线程池中执行
+_B64_OFFLOAD_THRESHOLD = 64 * 1024
+
+# 读取图片尺寸时先解码的 base64 长度（4 的倍数，约 48KB 原始数据）
+_INSPECT_HEAD_B64_LEN = 64 * 1024
+
+
+def _strip_whitespace(b64: str) -> str:
+    """去除 base64 中的空白；常见的无空白内容只做 C 层子串扫描即返回。"""
+    if not b64.isascii():
+        return _WHITESPACE_RE.sub("", b64)
+    for ch in _ASCII_WHITESPACE:
+        if ch in b64:
+            return (
+                b64.encode("ascii")
+                .translate(None, _ASCII_WHITESPACE_BYTES)
+                .decode("ascii")
+            )
+    return b64
+
+
+def _lock_key(value: str) -> str:
+    """锁名用的短摘要（非密码学用途），blake2b 直接输出 8 字节。"""
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+_UPLOAD_SESSION: Optional[AsyncSession] = None
+
+
+def _get_upload_session() -> AsyncSession:
+    """进程内共享的上传会话，跨请求复用连接池与 TLS 会话。"""
+    global _UPLOAD_SESSION
+    if _UPLOAD_SESSION is None:
+        # curl_cffi 默认只允许 10 个并发句柄，按上传并发上限放宽，避免请求在会话内排队；
+        # PIPEWAIT 让并发请求等待复用已有的 HTTP/2 连接多路复用，而不是各自新建连接
+        _UPLOAD_SESSION = AsyncSession(
+            max_clients=max(10, int(get_config("asset.upload_concurrent") or 0)),
+            curl_options={CurlOpt.PIPEWAIT: 1},
+        )
+    return _UPLOAD_SESSION
+
+
+async def close_upload_session():
+    """关闭共享的上传会话（应用关闭时调用）。"""
+    global _UPLOAD_SESSION
+    session, _UPLOAD_SESSION = _UPLOAD_SESSION, None
+    if session is not None:
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning("Close upload session failed: {}", e)
+
+
 class UploadService:
     """Assets upload service."""
 
     def __init__(self):
-        self._session: Optional[AsyncSession] = None
         self._chunk_size = 64 * 1024
 
     async def create(self) -> AsyncSession:
-        """Create or reuse a session."""
-        if self._session is None:
-            self._session = AsyncSession()
-        return self._session
+        """Return the shared upload session."""
+        return _get_upload_session()
 
     async def close(self):
-        """Close the session."""
-        if self._session:
-            await self._session.close()
-            self._session = None
+        """Release the service; the shared session stays open until shutdown."""
 
     @staticmethod
     def _normalize_image_to_jpeg(filename: str, b64: str, mime: str) -> Tuple[str, str, str]:
@@ -56,7 +128,7 @@ class UploadService:
             raise ValidationException(f"Pillow is required for image conversion: {e}")
 
         try:
-            raw = base64.b64decode(re.sub(r"\s+", "", b64), validate=True)
+            raw = base64.b64decode(_strip_whitespace(b64), validate=True)
         except Exception:
             raise ValidationException("Invalid image base64 content")
 
@@ -65,20 +137,21 @@ class UploadService:
                 img = ImageOps.exif_transpose(img)
                 width, height = img.size
                 if img.mode in ("RGBA", "LA"):
-                    bg = Image.new("RGB", img.size, (255, 255, 255))
-                    alpha = img.split()[-1]
-                    bg.paste(img.convert("RGBA"), mask=alpha)
-                    out_img = bg
+                    # 透明图叠到白底：alpha_composite 一次完成混合，
+                    # 省去单独拆分 alpha 通道与带 mask 的 paste
+                    bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
+                    out_img = Image.alpha_composite(bg, img.convert("RGBA")).convert("RGB")
                 else:
                     out_img = img.convert("RGB")
 
-                # 先做一次无元数据净化，避免源图中异常 profile/块影响上游解析
-                sanitized = Image.new("RGB", out_img.size)
-                sanitized.paste(out_img)
+                # 无元数据净化，避免源图中异常 profile/块影响上游解析：
+                # out_img 已是独立副本，直接清空 info（JPEG 编码会从中读取 ICC profile），
+                # 不再复制一份整图像素
+                out_img.info = {}
 
                 out = io.BytesIO()
                 # 使用更保守的 baseline JPEG 参数，减少兼容性问题
-                sanitized.save(
+                out_img.save(
                     out,
                     format="JPEG",
                     quality=92,
@@ -86,7 +159,8 @@ class UploadService:
                     progressive=False,
                     subsampling=2,
                 )
-                jpeg_b64 = base64.b64encode(out.getvalue()).decode()
+                # 直接对 BytesIO 的内部缓冲编码，省去 getvalue() 的整段拷贝
+                jpeg_b64 = base64.b64encode(out.getbuffer()).decode()
                 base_name = (filename or "file").rsplit(".", 1)[0]
                 jpeg_name = f"{base_name}.jpg"
                 logger.info(
@@ -109,7 +183,7 @@ class UploadService:
             raise ValidationException(f"Pillow is required for image conversion: {e}")
 
         try:
-            raw = base64.b64decode(re.sub(r"\s+", "", b64), validate=True)
+            raw = base64.b64decode(_strip_whitespace(b64), validate=True)
         except Exception:
             raise ValidationException("Invalid image base64 content")
 
@@ -125,7 +199,7 @@ class UploadService:
                     progressive=progressive,
                     subsampling=subsampling,
                 )
-                return base64.b64encode(out.getvalue()).decode()
+                return base64.b64encode(out.getbuffer()).decode()
         except Exception as e:
             raise ValidationException(f"Image conversion to JPEG failed: {e}")
 
@@ -137,8 +211,21 @@ class UploadService:
         except Exception as e:
             raise ValidationException(f"Pillow is required for image inspection: {e}")
 
+        b64 = _strip_whitespace(b64)
+        # 尺寸只需图片头：先解码开头一小段并由字节数推算原始大小，
+        # 头部不足以解析（或长度不规整）时再回退整段解码
+        if len(b64) % 4 == 0 and len(b64) > _INSPECT_HEAD_B64_LEN:
+            try:
+                head = base64.b64decode(b64[:_INSPECT_HEAD_B64_LEN], validate=True)
+                with Image.open(io.BytesIO(head)) as img:
+                    width, height = img.size
+                raw_size = len(b64) // 4 * 3 - b64[-2:].count("=")
+                return width, height, raw_size
+            except Exception:
+                pass
+
         try:
-            raw = base64.b64decode(re.sub(r"\s+", "", b64), validate=True)
+            raw = base64.b64decode(b64, validate=True)
         except Exception:
             raise ValidationException("Invalid image base64 content")
 
@@ -162,28 +249,41 @@ class UploadService:
 
     @staticmethod
     def _infer_mime(filename: str, fallback: str = "application/octet-stream") -> str:
+        # 常见媒体后缀直接查表，其余再交给 mimetypes
+        mime = _EXT_MIME.get(Path(filename).suffix.lower())
+        if mime:
+            return mime
         mime, _ = mimetypes.guess_type(filename)
         return mime or fallback
 
     @staticmethod
     async def _encode_b64_stream(chunks: AsyncIterator[bytes]) -> str:
-        parts = []
-        remain = b""
+        # 编码结果保持 bytes，最后拼接后只解码一次
+        parts: List[bytes] = []
+        # 持久累积缓冲：每块追加后按 3 字节对齐编码，再从头部删除已编码部分，
+        # 不再每块拼接/切片出新的 bytes 对象
+        buf = bytearray()
         async for chunk in chunks:
             if not chunk:
                 continue
-            chunk = remain + chunk
-            keep = len(chunk) % 3
-            if keep:
-                remain = chunk[-keep:]
-                chunk = chunk[:-keep]
-            else:
-                remain = b""
-            if chunk:
-                parts.append(base64.b64encode(chunk).decode())
-        if remain:
-            parts.append(base64.b64encode(remain).decode())
-        return "".join(parts)
+            buf += chunk
+            n = len(buf) - len(buf) % 3
+            if n:
+                with memoryview(buf) as view:
+                    parts.append(base64.b64encode(view[:n]))
+                del buf[:n]
+        if buf:
+            parts.append(base64.b64encode(buf))
+        return b"".join(parts).decode("ascii")
+
+    @staticmethod
+    async def _encode_b64_bytes(data: bytes) -> str:
+        # 非流式兜底：内容已整体在内存中，较大时放到线程池一次编码
+        if len(data) >= _B64_OFFLOAD_THRESHOLD:
+            encoded = await asyncio.to_thread(base64.b64encode, data)
+        else:
+            encoded = base64.b64encode(data)
+        return encoded.decode("ascii")
 
     async def _read_local_file(self, local_type: str, name: str) -> Tuple[str, str, str]:
         base_dir = DATA_DIR / "tmp"
@@ -192,18 +292,10 @@ class UploadService:
             mime = "video/mp4"
         else:
             local_dir = base_dir / "image"
-            suffix = Path(name).suffix.lower()
-            if suffix == ".png":
-                mime = "image/png"
-            elif suffix == ".webp":
-                mime = "image/webp"
-            elif suffix == ".gif":
-                mime = "image/gif"
-            else:
-                mime = "image/jpeg"
+            mime = _LOCAL_IMAGE_MIME.get(Path(name).suffix.lower(), "image/jpeg")
 
         local_path = local_dir / name
-        lock_name = f"ul_local_{hashlib.sha1(str(local_path).encode()).hexdigest()[:16]}"
+        lock_name = f"ul_local_{_lock_key(str(local_path))}"
         lock_timeout = max(1, int(get_config("asset.upload_timeout")))
         async with _file_lock(lock_name, timeout=lock_timeout):
             if not local_path.exists():
@@ -211,15 +303,17 @@ class UploadService:
             if not local_path.is_file():
                 raise ValidationException(f"Invalid local file: {local_path}")
 
-            async def _iter_file() -> AsyncIterator[bytes]:
-                async with aiofiles.open(local_path, "rb") as f:
-                    while True:
-                        chunk = await f.read(self._chunk_size)
-                        if not chunk:
-                            break
-                        yield chunk
-
-            b64 = await self._encode_b64_stream(_iter_file())
+            # 本地缓存文件大小已知：在线程中一次整体编码，
+            # 不再逐块经 aiofiles 线程往返再拼接编码结果；
+            # 通过 mmap 直接从页缓存编码，省去把整个文件读入用户态的拷贝
+            def _read_b64() -> str:
+                with open(local_path, "rb") as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        return ""
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        return base64.b64encode(mm).decode()
+
+            b64 = await asyncio.to_thread(_read_b64)
         filename = name or "file"
         return filename, b64, mime
 
@@ -241,7 +335,7 @@ class UploadService:
                         name = parts[3].replace("/", "-")
                         return await self._read_local_file(local_type, name)
 
-            lock_name = f"ul_url_{hashlib.sha1(url.encode()).hexdigest()[:16]}"
+            lock_name = f"ul_url_{_lock_key(url)}"
             timeout = float(get_config("asset.upload_timeout"))
             proxy_url = get_config("proxy.base_proxy_url")
             proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
@@ -272,9 +366,9 @@ class UploadService:
                         b64 = await self._encode_b64_stream(response.aiter_content())
                     except Exception:
                         # 某些响应对象虽存在 aiter_content，但底层未进入 stream 模式；回退读取 content。
-                        b64 = base64.b64encode(response.content).decode()
+                        b64 = await self._encode_b64_bytes(response.content)
                 else:
-                    b64 = base64.b64encode(response.content).decode()
+                    b64 = await self._encode_b64_bytes(response.content)
 
                 logger.debug(f"Fetched: {url}")
                 return filename, b64, content_type
@@ -299,7 +393,7 @@ class UploadService:
             raise ValidationException("Invalid data URI: missing base64 marker")
 
         mime = header[5:].split(";", 1)[0] or "application/octet-stream"
-        b64 = re.sub(r"\s+", "", b64)
+        b64 = _strip_whitespace(b64)
         if not mime or not b64:
             raise ValidationException("Invalid data URI: empty content")
         ext = mime.split("/")[-1] if "/" in mime else "bin"
@@ -331,7 +425,12 @@ class UploadService:
         """
         async with _get_upload_semaphore():
             filename, b64, mime = await self.check_format(file_input)
-            filename, b64, mime = self._normalize_image_to_jpeg(filename, b64, mime)
+            if str(mime or "").lower().strip().startswith("image/"):
+                # 解码与 JPEG 重编码是 CPU 密集操作（Pillow 期间释放 GIL），
+                # 放到线程池执行，避免阻塞事件循环上的其他请求
+                filename, b64, mime = await asyncio.to_thread(
+                    self._normalize_image_to_jpeg, filename, b64, mime
+                )
 
             logger.debug(
                 f"Upload prepare: filename={filename}, type={mime}, size={len(b64)}"
@@ -386,7 +485,9 @@ class UploadService:
                 last_error = e
                 for idx, profile in enumerate(fallback_profiles, start=1):
                     try:
-                        b64_retry = self._reencode_jpeg_with_profile(b64, **profile)
+                        b64_retry = await asyncio.to_thread(
+                            self._reencode_jpeg_with_profile, b64, **profile
+                        )
                         logger.warning(
                             "Upload image fallback re-encode retry: "
                             f"attempt={idx}, status={status}, profile={profile}, "
@@ -4,17 +4,97 @@ Reverse interface: app chat conversations.
 
 import orjson
 import inspect
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Final, List, Optional
 from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
-from app.core.config import get_config
+from app.core.config import config, get_config
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
 from app.services.reverse.utils.retry import retry_on_status
 
-CHAT_API = "https://grok.com/rest/app-chat/conversations/new"
+CHAT_API: Final = "https://grok.com/rest/app-chat/conversations/new"
+
+
+# 固定的设备环境信息，启动时序列化一次，orjson 直接拼接这段 JSON
+_DEVICE_ENV_INFO: Final = orjson.Fragment(
+    orjson.dumps(
+        {
+            "darkModeEnabled": False,
+            "devicePixelRatio": 2,
+            "screenWidth": 2056,
+            "screenHeight": 1329,
+            "viewportWidth": 2056,
+            "viewportHeight": 1083,
+        }
+    )
+)
+
+# 请求体中不随请求变化的部分；None 占位的键由 build_payload 按请求填充，
+# 模板保留完整键序，序列化结果与逐项构造一致
+_PAYLOAD_TEMPLATE: Final[Dict[str, Any]] = {
+    "deviceEnvInfo": _DEVICE_ENV_INFO,
+    "disableMemory": None,
+    "disableSearch": False,
+    "disableSelfHarmShortCircuit": False,
+    "disableTextFollowUps": False,
+    "enableImageGeneration": True,
+    "enableImageStreaming": True,
+    "enableSideBySide": True,
+    "fileAttachments": None,
+    "forceConcise": False,
+    "forceSideBySide": False,
+    "imageAttachments": [],
+    "imageGenerationCount": None,
+    "isAsyncChat": False,
+    "isReasoning": False,
+    "message": None,
+    "modelMode": None,
+    "modelName": None,
+    "responseMetadata": None,
+    "returnImageBytes": False,
+    "returnRawGrokInXaiRequest": False,
+    "sendFinalMetadata": True,
+    "temporary": None,
+    "toolOverrides": None,
+}
+
+
+@dataclass(frozen=True)
+class _AppChatConfig:
+    """app-chat 请求用到的配置快照。"""
+
+    disable_memory: Any
+    temporary: Any
+    proxies: Optional[Dict[str, str]]
+    timeout: float
+    browser: Any
+
+
+_APP_CHAT_CONFIG: Optional[_AppChatConfig] = None
+_APP_CHAT_CONFIG_VERSION = -1
+
+
+def _app_chat_cfg() -> _AppChatConfig:
+    """返回 app-chat 配置快照；配置重新加载或更新后自动重建。"""
+    global _APP_CHAT_CONFIG, _APP_CHAT_CONFIG_VERSION
+    if _APP_CHAT_CONFIG is None or _APP_CHAT_CONFIG_VERSION != config.version:
+        _APP_CHAT_CONFIG_VERSION = config.version
+        base_proxy = get_config("proxy.base_proxy_url")
+        _APP_CHAT_CONFIG = _AppChatConfig(
+            disable_memory=get_config("app.disable_memory"),
+            temporary=get_config("app.temporary"),
+            proxies={"http": base_proxy, "https": base_proxy} if base_proxy else None,
+            timeout=max(
+                float(get_config("chat.timeout") or 0),
+                float(get_config("video.timeout") or 0),
+                float(get_config("image.timeout") or 0),
+            ),
+            browser=get_config("proxy.browser"),
+        )
+    return _APP_CHAT_CONFIG
 
 
 class AppChatReverse:
@@ -24,53 +104,32 @@ class AppChatReverse:
     def build_payload(
         message: str,
         model: str,
-        mode: str = None,
-        file_attachments: List[str] = None,
-        tool_overrides: Dict[str, Any] = None,
-        model_config_override: Dict[str, Any] = None,
+        mode: Optional[str] = None,
+        file_attachments: Optional[List[str]] = None,
+        tool_overrides: Optional[Dict[str, Any]] = None,
+        model_config_override: Optional[Dict[str, Any]] = None,
         image_generation_count: int | None = None,
     ) -> Dict[str, Any]:
         """Build chat payload for Grok app-chat API."""
 
-        attachments = file_attachments or []
-
-        payload = {
-            "deviceEnvInfo": {
-                "darkModeEnabled": False,
-                "devicePixelRatio": 2,
-                "screenWidth": 2056,
-                "screenHeight": 1329,
-                "viewportWidth": 2056,
-                "viewportHeight": 1083,
-            },
-            "disableMemory": get_config("app.disable_memory"),
-            "disableSearch": False,
-            "disableSelfHarmShortCircuit": False,
-            "disableTextFollowUps": False,
-            "enableImageGeneration": True,
-            "enableImageStreaming": True,
-            "enableSideBySide": True,
-            "fileAttachments": attachments,
-            "forceConcise": False,
-            "forceSideBySide": False,
-            "imageAttachments": [],
-            "imageGenerationCount": image_generation_count
-            if image_generation_count is not None
-            else 2,
-            "isAsyncChat": False,
-            "isReasoning": False,
-            "message": message,
-            "modelMode": mode,
-            "modelName": model,
-            "responseMetadata": {
-                "requestModelDetails": {"modelId": model},
-            },
-            "returnImageBytes": False,
-            "returnRawGrokInXaiRequest": False,
-            "sendFinalMetadata": True,
-            "temporary": get_config("app.temporary"),
-            "toolOverrides": tool_overrides or {},
+        cfg = _app_chat_cfg()
+
+        # 静态字段来自模板（浅拷贝），只写入随请求变化的字段；
+        # responseMetadata 会被追加字段，每次新建
+        payload: Dict[str, Any] = _PAYLOAD_TEMPLATE.copy()
+        payload["disableMemory"] = cfg.disable_memory
+        payload["fileAttachments"] = file_attachments or []
+        payload["imageGenerationCount"] = (
+            image_generation_count if image_generation_count is not None else 2
+        )
+        payload["message"] = message
+        payload["modelMode"] = mode
+        payload["modelName"] = model
+        payload["responseMetadata"] = {
+            "requestModelDetails": {"modelId": model},
         }
+        payload["temporary"] = cfg.temporary
+        payload["toolOverrides"] = tool_overrides or {}
 
         if model_config_override:
             payload["responseMetadata"]["modelConfigOverride"] = model_config_override
@@ -107,8 +166,8 @@ class AppChatReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
+            cfg = _app_chat_cfg()
+            proxies = cfg.proxies
 
             # Build headers
             headers = build_headers(
@@ -138,19 +197,18 @@ class AppChatReverse:
                 f"tools={','.join((tool_overrides or {}).keys()) or '-'}"
             )
 
+            # 请求体只序列化一次，状态码重试复用同一份 bytes
+            body = orjson.dumps(payload)
+
             # Curl Config
-            timeout = max(
-                float(get_config("chat.timeout") or 0),
-                float(get_config("video.timeout") or 0),
-                float(get_config("image.timeout") or 0),
-            )
-            browser = get_config("proxy.browser")
+            timeout = cfg.timeout
+            browser = cfg.browser
 
             async def _do_request():
                 response = await session.post(
                     CHAT_API,
                     headers=headers,
-                    data=orjson.dumps(payload),
+                    data=body,
                     timeout=timeout,
                     stream=True,
                     proxies=proxies,
@@ -32,7 +32,7 @@ _CONTENT_TYPES = {
 class AssetsDownloadReverse:
     """assets.grok.com/{path} reverse interface."""
 
-    @dataclass
+    @dataclass(slots=True)
     class _SimpleResponse:
         status_code: int
         headers: dict[str, str]
@@ -52,9 +52,7 @@ class AssetsDownloadReverse:
             with urllib.request.urlopen(req, timeout=timeout) as resp:
                 status = int(getattr(resp, "status", 200) or 200)
                 body = resp.read()
-                raw_headers = {}
-                for k, v in dict(resp.headers.items()).items():
-                    raw_headers[str(k).lower()] = str(v)
+                raw_headers = {k.lower(): v for k, v in resp.headers.items()}
                 return status, raw_headers, body
 
         status, raw_headers, body = await asyncio.to_thread(_do_get)
@@ -2,95 +2,62 @@
 Reverse interface: upload asset.
 """
 
-import asyncio
-import json
-import urllib.error
-import urllib.request
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict, Optional
+
+import orjson
 from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
-from app.core.config import get_config
+from app.core.config import config, get_config
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.poster import (
+    TRANSIENT_STATUS,
+    body_preview,
+    is_transient_error,
+    post_with_fallback,
+    transient_status,
+)
 from app.services.reverse.utils.retry import retry_on_status
 
 UPLOAD_API = "https://grok.com/rest/app-chat/upload-file"
 
 
-class AssetsUploadReverse:
-    """/rest/app-chat/upload-file reverse interface."""
-
-    @dataclass
-    class _SimpleResponse:
-        status_code: int
-        headers: dict[str, str]
-        text: str
+@dataclass(frozen=True)
+class _UploadConfig:
+    """上传请求用到的配置快照。"""
 
-        def json(self):
-            return json.loads(self.text or "{}")
+    proxies: Dict[str, Optional[str]]
+    proxy_url: Optional[str]
+    timeout: Any
+    browser: Any
 
-    @staticmethod
-    async def _urllib_post(
-        url: str, headers: dict[str, str], payload: dict[str, Any], timeout: int, proxy_url: str
-    ) -> "AssetsUploadReverse._SimpleResponse":
-        """使用标准库 urllib 兜底上传，绕过 curl_cffi 异常。"""
-        body = json.dumps(payload).encode("utf-8")
-        opener = None
-        if proxy_url:
-            opener = urllib.request.build_opener(
-                urllib.request.ProxyHandler({"http": proxy_url, "https": proxy_url})
-            )
-        req = urllib.request.Request(url=url, data=body, headers=headers, method="POST")
 
-        def _do_post():
-            def _read_http_error(err: urllib.error.HTTPError):
-                status = int(getattr(err, "code", 500) or 500)
-                hdrs = {}
-                try:
-                    hdrs = {
-                        str(k).lower(): str(v)
-                        for k, v in dict((err.headers or {}).items()).items()
-                    }
-                except Exception:
-                    hdrs = {}
-                try:
-                    body = err.read().decode("utf-8", errors="replace")
-                except Exception:
-                    body = ""
-                return status, hdrs, body
+_UPLOAD_CONFIG: Optional[_UploadConfig] = None
+_UPLOAD_CONFIG_VERSION = -1
 
-            if opener is not None:
-                try:
-                    with opener.open(req, timeout=timeout) as resp:
-                        status = int(getattr(resp, "status", 200) or 200)
-                        raw_headers = {
-                            str(k).lower(): str(v)
-                            for k, v in dict(resp.headers.items()).items()
-                        }
-                        text = resp.read().decode("utf-8", errors="replace")
-                        return status, raw_headers, text
-                except urllib.error.HTTPError as e:
-                    return _read_http_error(e)
-            try:
-                with urllib.request.urlopen(req, timeout=timeout) as resp:
-                    status = int(getattr(resp, "status", 200) or 200)
-                    raw_headers = {
-                        str(k).lower(): str(v) for k, v in dict(resp.headers.items()).items()
-                    }
-                    text = resp.read().decode("utf-8", errors="replace")
-                    return status, raw_headers, text
-            except urllib.error.HTTPError as e:
-                return _read_http_error(e)
 
-        status, raw_headers, text = await asyncio.to_thread(_do_post)
-        return AssetsUploadReverse._SimpleResponse(
-            status_code=status,
-            headers=raw_headers,
-            text=text,
+def _upload_cfg() -> _UploadConfig:
+    """返回上传配置快照；配置重新加载或更新后自动重建。"""
+    global _UPLOAD_CONFIG, _UPLOAD_CONFIG_VERSION
+    if _UPLOAD_CONFIG is None or _UPLOAD_CONFIG_VERSION != config.version:
+        _UPLOAD_CONFIG_VERSION = config.version
+        proxy_url = get_config("proxy.asset_proxy_url") or get_config(
+            "proxy.base_proxy_url"
         )
+        _UPLOAD_CONFIG = _UploadConfig(
+            proxies={"http": proxy_url, "https": proxy_url},
+            proxy_url=proxy_url,
+            timeout=get_config("asset.upload_timeout"),
+            browser=get_config("proxy.browser"),
+        )
+    return _UPLOAD_CONFIG
+
+
+class AssetsUploadReverse:
+    """/rest/app-chat/upload-file reverse interface."""
 
     @staticmethod
     async def request(session: AsyncSession, token: str, fileName: str, fileMimeType: str, content: str) -> Any:
@@ -108,14 +75,9 @@ class AssetsUploadReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            assert_proxy = get_config("proxy.asset_proxy_url")
-            if assert_proxy:
-                proxies = {"http": assert_proxy, "https": assert_proxy}
-                proxy_url = assert_proxy
-            else:
-                proxies = {"http": base_proxy, "https": base_proxy}
-                proxy_url = base_proxy
+            cfg = _upload_cfg()
+            proxies = cfg.proxies
+            proxy_url = cfg.proxy_url
 
             # Build headers
             headers = build_headers(
@@ -131,148 +93,66 @@ class AssetsUploadReverse:
                 "fileMimeType": fileMimeType,
                 "content": content,
             }
+            # 请求体只序列化一次：content 常为数 MB 的 base64，
+            # 主请求、直连降级、aiohttp 兜底与状态码重试都复用同一份 bytes。
+            # 接口只接受内嵌 base64 的 JSON，且请求体需可重放，因此不改为一次性的流式生成器
+            body = orjson.dumps(payload)
             logger.info(
                 "AssetsUpload request prepared: "
                 f"fileName={fileName}, fileMimeType={fileMimeType}, content_len={len(content or '')}"
             )
 
             # Curl Config
-            timeout = get_config("asset.upload_timeout")
-            browser = get_config("proxy.browser")
+            timeout = cfg.timeout
+            browser = cfg.browser
 
             async def _do_request():
-                try:
-                    try:
-                        response = await session.post(
-                            UPLOAD_API,
-                            headers=headers,
-                            json=payload,
-                            proxies=proxies,
-                            timeout=timeout,
-                            impersonate=browser,
-                        )
-                    except Exception as first_err:
-                        logger.warning(
-                            "AssetsUploadReverse primary request failed, fallback direct: "
-                            f"error={first_err}"
-                        )
-                        try:
-                            response = await session.post(
-                                UPLOAD_API,
-                                headers=headers,
-                                json=payload,
-                                timeout=timeout,
-                            )
-                        except Exception as second_err:
-                            logger.warning(
-                                "AssetsUploadReverse direct curl request failed, "
-                                f"fallback urllib: error={second_err}"
-                            )
-                            response = await AssetsUploadReverse._urllib_post(
-                                url=UPLOAD_API,
-                                headers=headers,
-                                payload=payload,
-                                timeout=timeout,
-                                proxy_url=proxy_url,
-                            )
-                    if response.status_code != 200:
-                        body_preview = ""
-                        try:
-                            body_preview = (response.text or "").strip().replace("\n", " ")
-                        except Exception:
-                            body_preview = ""
-                        if len(body_preview) > 300:
-                            body_preview = f"{body_preview[:300]}...(len={len(body_preview)})"
-                        logger.error(
-                            "AssetsUploadReverse: Upload failed, "
-                            f"status={response.status_code}, body={body_preview or '-'}",
-                            extra={"error_type": "UpstreamException"},
-                        )
-                        raise UpstreamException(
-                            message=f"AssetsUploadReverse: Upload failed, {response.status_code}",
-                            details={"status": response.status_code, "body": body_preview},
-                        )
-                    return response
-                except UpstreamException:
-                    raise
-                except Exception as inner_err:
-                    err_msg = str(inner_err)
+                response, errors = await post_with_fallback(
+                    "AssetsUploadReverse",
+                    session,
+                    UPLOAD_API,
+                    headers=headers,
+                    body=body,
+                    proxies=proxies,
+                    proxy_url=proxy_url,
+                    timeout=timeout,
+                    browser=browser,
+                )
+                if response is None:
+                    err_msg = str(errors[-1])
                     # 这类异常在实际环境里多为瞬时网络/上游抖动，按可重试处理。
-                    if "curl: (35)" in err_msg or '"code"' in err_msg:
+                    if any(is_transient_error(err) for err in errors):
                         logger.warning(
-                            "AssetsUpload transient exception, mark as retryable: "
-                            f"{err_msg}"
+                            f"AssetsUpload transient exception, mark as retryable: {err_msg}"
                         )
-                        last_fallback_error: UpstreamException | None = None
-                        # 部分 '"code"' 异常不会走到上面的降级分支，这里再强制兜底一次。
-                        try:
-                            response = await session.post(
-                                UPLOAD_API,
-                                headers=headers,
-                                json=payload,
-                                timeout=timeout,
-                            )
-                            if response.status_code == 200:
-                                logger.info(
-                                    "AssetsUpload recovered by forced direct fallback after transient error"
-                                )
-                                return response
-                            body_preview = ""
-                            try:
-                                body_preview = (response.text or "").strip().replace("\n", " ")
-                            except Exception:
-                                body_preview = ""
-                            if len(body_preview) > 300:
-                                body_preview = f"{body_preview[:300]}...(len={len(body_preview)})"
-                            raise UpstreamException(
-                                message=f"AssetsUpload forced direct failed: {response.status_code}",
-                                details={"status": response.status_code, "body": body_preview},
-                            )
-                        except Exception as forced_direct_err:
-                            if isinstance(forced_direct_err, UpstreamException):
-                                last_fallback_error = forced_direct_err
-                            logger.warning(
-                                "AssetsUpload forced direct fallback failed, "
-                                f"error={forced_direct_err}"
-                            )
-
-                        try:
-                            response = await AssetsUploadReverse._urllib_post(
-                                url=UPLOAD_API,
-                                headers=headers,
-                                payload=payload,
-                                timeout=timeout,
-                                proxy_url=proxy_url,
-                            )
-                            if response.status_code == 200:
-                                logger.info(
-                                    "AssetsUpload recovered by forced urllib fallback after transient error"
-                                )
-                                return response
-                            body_preview = (response.text or "").strip().replace("\n", " ")
-                            if len(body_preview) > 300:
-                                body_preview = f"{body_preview[:300]}...(len={len(body_preview)})"
-                            raise UpstreamException(
-                                message=f"AssetsUpload forced urllib failed: {response.status_code}",
-                                details={"status": response.status_code, "body": body_preview},
-                            )
-                        except Exception as forced_urllib_err:
-                            if isinstance(forced_urllib_err, UpstreamException):
-                                last_fallback_error = forced_urllib_err
-                            logger.warning(
-                                "AssetsUpload forced urllib fallback failed, "
-                                f"error={forced_urllib_err}"
-                            )
-
-                        if last_fallback_error is not None:
-                            raise last_fallback_error
                         raise UpstreamException(
                             message=f"AssetsUpload transient failure: {err_msg}",
-                            details={"status": 403, "error": err_msg},
+                            details={
+                                "status": TRANSIENT_STATUS,
+                                "error": err_msg,
+                                "transient": True,
+                            },
                         )
-                    raise
-
-            return await retry_on_status(_do_request)
+                    raise errors[-1]
+
+                if response.status_code != 200:
+                    preview = body_preview(response)
+                    logger.error(
+                        "AssetsUploadReverse: Upload failed, "
+                        f"status={response.status_code}, body={preview or '-'}",
+                        extra={"error_type": "UpstreamException"},
+                    )
+                    raise UpstreamException(
+                        message=f"AssetsUploadReverse: Upload failed, {response.status_code}",
+                        details={"status": response.status_code, "body": preview},
+                    )
+                return response
+
+            return await retry_on_status(
+                _do_request,
+                extract_status=transient_status,
+                extra_retry_codes=(TRANSIENT_STATUS,),
+            )
 
         except Exception as e:
             # Handle upstream exception
@@ -2,68 +2,60 @@
 Reverse interface: media post create.
 """
 
-import asyncio
-import json
-import urllib.request
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Dict, Optional
+
+import orjson
 from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
-from app.core.config import get_config
+from app.core.config import config, get_config
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
+from app.services.reverse.utils.poster import (
+    TRANSIENT_STATUS,
+    body_preview,
+    is_transient_error,
+    post_with_fallback,
+    transient_status,
+)
 from app.services.reverse.utils.retry import retry_on_status
 
 MEDIA_POST_API = "https://grok.com/rest/media/post/create"
-class MediaPostReverse:
-    """/rest/media/post/create reverse interface."""
 
-    @dataclass
-    class _SimpleResponse:
-        status_code: int
-        headers: dict[str, str]
-        text: str
 
-        def json(self):
-            return json.loads(self.text or "{}")
+@dataclass(frozen=True)
+class _MediaPostConfig:
+    """media post 请求用到的配置快照。"""
 
-    @staticmethod
-    async def _urllib_post(
-        url: str, headers: dict[str, str], payload: dict[str, Any], timeout: int, proxy_url: str
-    ) -> "MediaPostReverse._SimpleResponse":
-        body = json.dumps(payload).encode("utf-8")
-        opener = None
-        if proxy_url:
-            opener = urllib.request.build_opener(
-                urllib.request.ProxyHandler({"http": proxy_url, "https": proxy_url})
-            )
-        req = urllib.request.Request(url=url, data=body, headers=headers, method="POST")
-
-        def _do_post():
-            if opener is not None:
-                with opener.open(req, timeout=timeout) as resp:
-                    status = int(getattr(resp, "status", 200) or 200)
-                    raw_headers = {
-                        str(k).lower(): str(v) for k, v in dict(resp.headers.items()).items()
-                    }
-                    text = resp.read().decode("utf-8", errors="replace")
-                    return status, raw_headers, text
-            with urllib.request.urlopen(req, timeout=timeout) as resp:
-                status = int(getattr(resp, "status", 200) or 200)
-                raw_headers = {
-                    str(k).lower(): str(v) for k, v in dict(resp.headers.items()).items()
-                }
-                text = resp.read().decode("utf-8", errors="replace")
-                return status, raw_headers, text
-
-        status, raw_headers, text = await asyncio.to_thread(_do_post)
-        return MediaPostReverse._SimpleResponse(
-            status_code=status,
-            headers=raw_headers,
-            text=text,
+    proxies: Optional[Dict[str, str]]
+    proxy_url: Optional[str]
+    timeout: Any
+    browser: Any
+
+
+_MEDIA_POST_CONFIG: Optional[_MediaPostConfig] = None
+_MEDIA_POST_CONFIG_VERSION = -1
+
+
+def _media_post_cfg() -> _MediaPostConfig:
+    """返回 media post 配置快照；配置重新加载或更新后自动重建。"""
+    global _MEDIA_POST_CONFIG, _MEDIA_POST_CONFIG_VERSION
+    if _MEDIA_POST_CONFIG is None or _MEDIA_POST_CONFIG_VERSION != config.version:
+        _MEDIA_POST_CONFIG_VERSION = config.version
+        base_proxy = get_config("proxy.base_proxy_url")
+        _MEDIA_POST_CONFIG = _MediaPostConfig(
+            proxies={"http": base_proxy, "https": base_proxy} if base_proxy else None,
+            proxy_url=base_proxy,
+            timeout=get_config("video.timeout"),
+            browser=get_config("proxy.browser"),
         )
+    return _MEDIA_POST_CONFIG
+
+
+class MediaPostReverse:
+    """/rest/media/post/create reverse interface."""
 
     @staticmethod
     async def request(
@@ -86,9 +78,9 @@ class MediaPostReverse:
         """
         try:
             # Get proxies
-            base_proxy = get_config("proxy.base_proxy_url")
-            proxies = {"http": base_proxy, "https": base_proxy} if base_proxy else None
-            proxy_url = base_proxy
+            cfg = _media_post_cfg()
+            proxies = cfg.proxies
+            proxy_url = cfg.proxy_url
 
             # Build headers
             headers = build_headers(
@@ -104,58 +96,48 @@ class MediaPostReverse:
                 payload["mediaUrl"] = mediaUrl
             if prompt:
                 payload["prompt"] = prompt
+            # 请求体只序列化一次，降级、兜底与重试复用同一份 bytes
+            body = orjson.dumps(payload)
             logger.info(
                 "MediaPost request prepared: "
                 f"mediaType={mediaType}, has_media_url={bool(mediaUrl)}, prompt_len={len(prompt or '')}"
             )
 
             # Curl Config
-            timeout = get_config("video.timeout")
-            browser = get_config("proxy.browser")
+            timeout = cfg.timeout
+            browser = cfg.browser
 
             async def _do_request():
-                try:
-                    response = await session.post(
-                        MEDIA_POST_API,
-                        headers=headers,
-                        json=payload,
-                        timeout=timeout,
-                        proxies=proxies,
-                        impersonate=browser,
-                    )
-                except Exception as first_err:
-                    logger.warning(
-                        "MediaPostReverse primary request failed, fallback direct: "
-                        f"error={first_err}"
-                    )
-                    try:
-                        response = await session.post(
-                            MEDIA_POST_API,
-                            headers=headers,
-                            json=payload,
-                            timeout=timeout,
-                        )
-                    except Exception as second_err:
+                response, errors = await post_with_fallback(
+                    "MediaPostReverse",
+                    session,
+                    MEDIA_POST_API,
+                    headers=headers,
+                    body=body,
+                    proxies=proxies,
+                    proxy_url=proxy_url,
+                    timeout=timeout,
+                    browser=browser,
+                )
+                if response is None:
+                    err_msg = str(errors[-1])
+                    # 瞬时网络故障标记为可重试的 502，交由状态码重试处理
+                    if any(is_transient_error(err) for err in errors):
                         logger.warning(
-                            "MediaPostReverse direct curl request failed, "
-                            f"fallback urllib: error={second_err}"
+                            f"MediaPost transient exception, mark as retryable: {err_msg}"
                         )
-                        response = await MediaPostReverse._urllib_post(
-                            url=MEDIA_POST_API,
-                            headers=headers,
-                            payload=payload,
-                            timeout=timeout,
-                            proxy_url=proxy_url,
+                        raise UpstreamException(
+                            message=f"MediaPost transient failure: {err_msg}",
+                            details={
+                                "status": TRANSIENT_STATUS,
+                                "error": err_msg,
+                                "transient": True,
+                            },
                         )
+                    raise errors[-1]
 
                 if response.status_code != 200:
-                    content = ""
-                    try:
-                        content = (response.text or "").strip().replace("\n", " ")
-                    except Exception:
-                        pass
-                    if len(content) > 300:
-                        content = f"{content[:300]}...(len={len(content)})"
+                    content = body_preview(response)
                     logger.error(
                         "MediaPostReverse: Media post create failed, "
                         f"status={response.status_code}, body={content or '-'}",
@@ -168,7 +150,11 @@ class MediaPostReverse:
 
                 return response
 
-            return await retry_on_status(_do_request)
+            return await retry_on_status(
+                _do_request,
+                extract_status=transient_status,
+                extra_retry_codes=(TRANSIENT_STATUS,),
+            )
 
         except Exception as e:
             # Handle upstream exception
@@ -5,6 +5,8 @@ Reverse interface: set birth date.
 import datetime
 import random
 from typing import Any
+
+import orjson
 from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
@@ -57,6 +59,8 @@ class SetBirthReverse:
                 f"T{hour:02d}:{minute:02d}:{second:02d}.{microsecond:03d}Z"
             }
 
+            body = orjson.dumps(payload)
+
             # Curl Config
             timeout = get_config("nsfw.timeout")
             browser = get_config("proxy.browser")
@@ -65,7 +69,7 @@ class SetBirthReverse:
                 response = await session.post(
                     SET_BIRTH_API,
                     headers=headers,
-                    json=payload,
+                    data=body,
                     timeout=timeout,
                     proxies=proxies,
                     impersonate=browser,
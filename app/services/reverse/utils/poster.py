@@ -0,0 +1,200 @@
+"""
+Reverse JSON POST utilities with layered fallback.
+"""
+
+import ssl
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import orjson
+from curl_cffi import CurlECode, CurlError
+from curl_cffi.requests import AsyncSession
+
+from app.core.logger import logger
+from app.core.exceptions import UpstreamException
+from app.services.reverse.utils.websocket import resolve_proxy
+
+
+# 视为瞬时故障、交由状态码重试处理的 libcurl 错误码
+_TRANSIENT_CURL_CODES = frozenset(
+    {
+        CurlECode.HTTP2,
+        CurlECode.SSL_CONNECT_ERROR,
+        CurlECode.GOT_NOTHING,
+        CurlECode.SEND_ERROR,
+        CurlECode.RECV_ERROR,
+        CurlECode.HTTP2_STREAM,
+    }
+)
+
+# 无 libcurl 错误码可用时（异常被包装成文本、aiohttp/ssl 兜底失败）识别瞬时故障的文本特征
+_TRANSIENT_ERROR_MARKERS = (
+    "curl: (16)",
+    "curl: (35)",
+    "curl: (52)",
+    "curl: (55)",
+    "curl: (56)",
+    "curl: (92)",
+    "connection reset",
+    "server disconnected",
+    "unexpected eof",
+)
+
+# 瞬时故障上报的状态码：可重试的网关错误。不用 403，403 会被调用方视为 token 失效而轮换
+TRANSIENT_STATUS = 502
+
+
+@dataclass(slots=True)
+class SimpleResponse:
+    """兜底请求的响应，接口与 curl_cffi 响应的常用部分一致。"""
+
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    _parsed: Any = field(default=None, init=False, repr=False)
+
+    @property
+    def text(self) -> str:
+        # 按需解码，只看状态码/预览时不生成完整字符串
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        # 直接解析 bytes；解析结果缓存，重复调用不再重新解析
+        if self._parsed is None:
+            self._parsed = orjson.loads(self.content or b"{}")
+        return self._parsed
+
+
+def is_transient_error(err: Exception) -> bool:
+    """判定瞬时网络故障：优先按异常类型与 libcurl 错误码，其余按已知文本特征匹配。"""
+    if isinstance(err, CurlError) and err.code in _TRANSIENT_CURL_CODES:
+        return True
+    if isinstance(
+        err,
+        (
+            aiohttp.ServerDisconnectedError,
+            aiohttp.ClientOSError,
+            aiohttp.ClientPayloadError,
+            ssl.SSLError,
+            ConnectionResetError,
+        ),
+    ):
+        return True
+    text = str(err).lower()
+    return any(marker in text for marker in _TRANSIENT_ERROR_MARKERS)
+
+
+def transient_status(err: Exception) -> Optional[int]:
+    """retry_on_status 的状态码提取：TRANSIENT_STATUS 只对标记为瞬时故障的异常生效，
+    上游真实返回的 502 仍不重试（上传、创建 post 非幂等）。"""
+    if not isinstance(err, UpstreamException):
+        return None
+    details = err.details if isinstance(err.details, dict) else {}
+    status = details.get("status", getattr(err, "status_code", None))
+    if status == TRANSIENT_STATUS and not details.get("transient"):
+        return None
+    return status
+
+
+def body_preview(response: Any, limit: int = 300) -> str:
+    """错误响应正文预览：只解码前 limit 字节，不整体解码响应体。"""
+    try:
+        raw = getattr(response, "content", None)
+        if isinstance(raw, (bytes, bytearray)):
+            preview = raw[:limit].decode("utf-8", errors="replace")
+        else:
+            raw = response.text or ""
+            preview = raw[:limit]
+    except Exception:
+        return ""
+    preview = preview.strip().replace("\n", " ")
+    if len(raw) > limit:
+        preview = f"{preview}...(len={len(raw)})"
+    return preview
+
+
+async def aiohttp_post(
+    url: str, headers: dict[str, str], body: bytes, timeout: float, proxy_url: str
+) -> SimpleResponse:
+    """使用 aiohttp 兜底 POST：走标准库 ssl 实现以绕过 curl_cffi 异常，且直接运行在事件循环上。
+
+    与原先的 urllib 兜底一样不做浏览器指纹伪装：上游启用 Cloudflare 挑战时预期会返回 403
+    挑战页（按普通失败状态码处理），只用于 curl 自身 TLS/HTTP2 故障而上游未拦截的场景。
+    """
+    connector, proxy = resolve_proxy(proxy_url)
+    client_timeout = aiohttp.ClientTimeout(total=float(timeout)) if timeout else None
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as client:
+        async with client.post(url, data=body, headers=headers, proxy=proxy) as resp:
+            return SimpleResponse(
+                status_code=resp.status,
+                headers={k.lower(): v for k, v in resp.headers.items()},
+                content=await resp.read(),
+            )
+
+
+async def post_with_fallback(
+    label: str,
+    session: AsyncSession,
+    url: str,
+    *,
+    headers: dict[str, str],
+    body: bytes,
+    proxies: Optional[Dict[str, str]],
+    proxy_url: str,
+    timeout: float,
+    browser: Any,
+) -> Tuple[Optional[Any], List[Exception]]:
+    """依次降级 POST：代理+指纹 -> curl 直连 -> aiohttp 兜底（绕开 curl TLS 实现）。
+
+    每种方式最多执行一次，不检查状态码。上传、创建 post 等接口非幂等，
+    前一种方式失败后才尝试下一种，不做并行对冲，避免上游重复创建资源。
+    aiohttp 兜底没有指纹伪装，位于 Cloudflare 挑战之后时预期失败，仅作为最后手段保留。
+
+    Returns:
+        Tuple[Optional[Any], List[Exception]]: 首个拿到的响应（全部失败时为 None）与各方式的异常。
+    """
+
+    async def _send_primary():
+        return await session.post(
+            url,
+            headers=headers,
+            data=body,
+            proxies=proxies,
+            timeout=timeout,
+            impersonate=browser,
+        )
+
+    async def _send_direct():
+        return await session.post(url, headers=headers, data=body, timeout=timeout)
+
+    async def _send_aiohttp():
+        return await aiohttp_post(url, headers, body, timeout, proxy_url)
+
+    errors: List[Exception] = []
+    for name, send in (
+        ("primary", _send_primary),
+        ("direct", _send_direct),
+        ("aiohttp", _send_aiohttp),
+    ):
+        try:
+            response = await send()
+        except Exception as err:
+            errors.append(err)
+            logger.warning(f"{label} {name} request failed: error={err}")
+            continue
+        if errors:
+            logger.info(f"{label} recovered by {name} fallback")
+        return response, errors
+    return None, errors
+
+
+__all__ = [
+    "SimpleResponse",
+    "TRANSIENT_STATUS",
+    "aiohttp_post",
+    "body_preview",
+    "is_transient_error",
+    "post_with_fallback",
+    "transient_status",
+]
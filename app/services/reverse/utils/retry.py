@@ -4,7 +4,7 @@ Reverse retry utilities.
 
 import asyncio
 import random
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Iterable, Optional
 
 from app.core.logger import logger
 from app.core.config import get_config
@@ -14,10 +14,12 @@ from app.core.exceptions import UpstreamException
 class RetryContext:
     """Retry context."""
 
-    def __init__(self):
+    def __init__(self, extra_retry_codes: Iterable[int] = ()):
         self.attempt = 0
         self.max_retry = int(get_config("retry.max_retry"))
         self.retry_codes = get_config("retry.retry_status_codes")
+        if extra_retry_codes:
+            self.retry_codes = [*self.retry_codes, *extra_retry_codes]
         self.last_error = None
         self.last_status = None
         self.total_delay = 0.0
@@ -123,6 +125,7 @@ async def retry_on_status(
     *args,
     extract_status: Callable[[Exception], Optional[int]] = None,
     on_retry: Callable[[int, int, Exception, float], None] = None,
+    extra_retry_codes: Iterable[int] = (),
     **kwargs,
 ) -> Any:
     """
@@ -133,6 +136,7 @@ async def retry_on_status(
         *args: Function arguments
         extract_status: Function to extract status code from exception
         on_retry: Callback function for retry (attempt, status_code, error, delay)
+        extra_retry_codes: Status codes retried in addition to retry.retry_status_codes
         **kwargs: Function keyword arguments
 
     Returns:
@@ -141,7 +145,7 @@ async def retry_on_status(
     Raises:
         Last failed exception
     """
-    ctx = RetryContext()
+    ctx = RetryContext(extra_retry_codes)
 
     # Status code extractor
     if extract_status is None:
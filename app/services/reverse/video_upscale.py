@@ -3,6 +3,8 @@ Reverse interface: video upscale.
 """
 
 from typing import Any
+
+import orjson
 from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
@@ -45,6 +47,8 @@ class VideoUpscaleReverse:
             payload = {"videoId": video_id}
             logger.info(f"VideoUpscale request prepared: video_id={video_id}")
 
+            body = orjson.dumps(payload)
+
             # Curl Config
             timeout = get_config("video.timeout")
             browser = get_config("proxy.browser")
@@ -53,7 +57,7 @@ class VideoUpscaleReverse:
                 response = await session.post(
                     VIDEO_UPSCALE_API,
                     headers=headers,
-                    json=payload,
+                    data=body,
                     timeout=timeout,
                     proxies=proxies,
                     impersonate=browser,
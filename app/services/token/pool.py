@@ -36,23 +36,25 @@ class TokenPool:
         2. 优先选择剩余额度最多的
         3. 如果额度相同，随机选择（避免并发冲突）
         """
-        # 选择 token
-        available = [
-            t
-            for t in self._tokens.values()
-            if t.status == TokenStatus.ACTIVE and t.quota > 0
-            and (not exclude or t.token not in exclude)
-        ]
-
-        if not available:
+        # 单次遍历筛选最大额度的候选；排除集合为空时跳过成员检查
+        max_quota = 0
+        candidates: List[TokenInfo] = []
+        for t in self._tokens.values():
+            if t.status != TokenStatus.ACTIVE or t.quota <= 0:
+                continue
+            if t.quota < max_quota:
+                continue
+            if exclude and t.token in exclude:
+                continue
+            if t.quota > max_quota:
+                max_quota = t.quota
+                candidates = [t]
+            else:
+                candidates.append(t)
+
+        if not candidates:
             return None
 
-        # 找到最大额度
-        max_quota = max(t.quota for t in available)
-
-        # 筛选最大额度
-        candidates = [t for t in available if t.quota == max_quota]
-
         # 随机选择
         return random.choice(candidates)
 
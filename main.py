@@ -9,12 +9,16 @@ import argparse
 import os
 import platform
 import sys
+import uuid
 from pathlib import Path
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
 import asyncio
 
 from dotenv import load_dotenv
-import httpx
+import aiofiles
+
+if TYPE_CHECKING:
+    import httpx
 
 BASE_DIR = Path(__file__).resolve().parent
 APP_DIR = BASE_DIR / "app"
@@ -46,6 +50,7 @@ from app.services.token import get_scheduler  # noqa: E402
 from app.api.v1.admin_api import router as admin_router
 from app.api.v1.public_api import router as public_router
 from app.api.pages import router as pages_router
+from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 # 初始化日志
@@ -86,48 +91,155 @@ FFMPEG_VENDOR_ASSETS: Dict[str, List[str]] = {
     ],
 }
 
+# 主 CDN 超过该秒数仍未完成时，再启动下一个候选对冲
+FFMPEG_VENDOR_HEDGE_DELAY = 5.0
+# 同一文件同时进行的候选下载上限
+FFMPEG_VENDOR_MAX_INFLIGHT = 2
+
+
+async def _fetch_vendor_candidate(
+    client: "httpx.AsyncClient", filename: str, url: str, tmp_path: Path
+) -> int:
+    """流式下载到临时文件，返回写入字节数；失败返回 0。"""
+    try:
+        async with client.stream("GET", url, follow_redirects=True) as resp:
+            if resp.status_code != 200:
+                logger.warning(
+                    f"FFmpeg vendor candidate failed: {filename} <- {url} status={resp.status_code}"
+                )
+                return 0
+            size = 0
+            async with aiofiles.open(tmp_path, "wb") as f:
+                async for chunk in resp.aiter_bytes():
+                    await f.write(chunk)
+                    size += len(chunk)
+            return size
+    except Exception as e:
+        logger.warning(f"FFmpeg vendor download error: {filename} <- {url}, error={e}")
+    return 0
+
 
 async def _download_first_success(
-    client: httpx.AsyncClient, filename: str, urls: List[str], target_path: Path
+    client: "httpx.AsyncClient", filename: str, urls: List[str], target_path: Path
 ) -> bool:
-    for url in urls:
-        try:
-            resp = await client.get(url, follow_redirects=True)
-            if resp.status_code == 200 and resp.content:
-                target_path.write_bytes(resp.content)
-                logger.info(
-                    f"FFmpeg vendor downloaded: {filename} <- {url} ({len(resp.content)} bytes)"
-                )
-                return True
-            logger.warning(
-                f"FFmpeg vendor candidate failed: {filename} <- {url} status={resp.status_code}"
+    # 有界竞速：先只请求主 CDN，失败时立即换下一个候选；主 CDN 超过对冲延迟仍未完成时
+    # 再启动一个备用候选，同时进行的下载不超过 FFMPEG_VENDOR_MAX_INFLIGHT 个，
+    # 避免每次冷启动把大体积的 wasm 从所有 CDN 各下载一遍；
+    # 每个候选写入各自的临时文件，成功后原子替换，中断的下载不会留下残缺文件；
+    # 多 worker 同时冷启动时各进程也会并发预热，临时文件名带进程号与随机后缀避免互相覆盖
+    tmp_suffix = f"{os.getpid()}.{uuid.uuid4().hex[:8]}"
+    tmp_paths = [
+        target_path.with_name(f"{target_path.name}.{tmp_suffix}.{idx}.tmp")
+        for idx in range(len(urls))
+    ]
+    candidates = list(zip(urls, tmp_paths))
+    pending: Dict[asyncio.Task, tuple] = {}
+
+    def _launch_next() -> None:
+        if candidates and len(pending) < FFMPEG_VENDOR_MAX_INFLIGHT:
+            url, tmp_path = candidates.pop(0)
+            task = asyncio.create_task(
+                _fetch_vendor_candidate(client, filename, url, tmp_path)
+            )
+            pending[task] = (url, tmp_path)
+
+    _launch_next()
+    try:
+        while pending:
+            can_hedge = bool(candidates) and len(pending) < FFMPEG_VENDOR_MAX_INFLIGHT
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=FFMPEG_VENDOR_HEDGE_DELAY if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
             )
-        except Exception as e:
-            logger.warning(f"FFmpeg vendor download error: {filename} <- {url}, error={e}")
+            if not done:
+                # 当前候选迟迟未完成，启动下一个候选对冲
+                _launch_next()
+                continue
+            for task in done:
+                url, tmp_path = pending.pop(task)
+                size = task.result()
+                if size:
+                    try:
+                        os.replace(tmp_path, target_path)
+                    except FileNotFoundError:
+                        # 临时文件已不存在时，若其他 worker 已完成下载则视为成功
+                        if not (target_path.exists() and target_path.stat().st_size > 0):
+                            _launch_next()
+                            continue
+                    logger.info(
+                        f"FFmpeg vendor downloaded: {filename} <- {url} ({size} bytes)"
+                    )
+                    return True
+                # 失败的候选立即由下一个补上
+                _launch_next()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for tmp_path in tmp_paths:
+            try:
+                tmp_path.unlink(missing_ok=True)
+            except Exception:
+                pass
     return False
 
 
 async def ensure_ffmpeg_vendor_assets() -> None:
     """启动时预热 ffmpeg 前端依赖到本地静态目录，避免浏览器跨域/CORS 问题。"""
+    # 文件已打包进镜像或由 CDN 提供时可跳过预热
+    if os.getenv("FFMPEG_VENDOR_MODE", "").strip().lower() == "cdn":
+        logger.info("FFmpeg vendor warmup skipped (FFMPEG_VENDOR_MODE=cdn)")
+        return
+
     FFMPEG_VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    # 一次目录扫描得到已存在的非空文件，不再逐个 exists()+stat()
+    with os.scandir(FFMPEG_VENDOR_DIR) as entries:
+        existing = {
+            entry.name
+            for entry in entries
+            if entry.name in FFMPEG_VENDOR_ASSETS
+            and entry.is_file()
+            and entry.stat().st_size > 0
+        }
+    pending: list[tuple[str, List[str], Path]] = []
+    for filename, urls in FFMPEG_VENDOR_ASSETS.items():
+        if filename in existing:
+            logger.info(f"FFmpeg vendor exists: {filename}")
+            continue
+        pending.append((filename, urls, FFMPEG_VENDOR_DIR / filename))
+
+    if not pending:
+        return
+
+    # httpx 只在需要下载 vendor 文件时用到，延迟导入以缩短冷启动的模块导入时间
+    import httpx
+
     timeout = httpx.Timeout(connect=8.0, read=30.0, write=30.0, pool=8.0)
     async with httpx.AsyncClient(timeout=timeout) as client:
-        tasks = []
-        pending_names: list[str] = []
-        for filename, urls in FFMPEG_VENDOR_ASSETS.items():
-            target = FFMPEG_VENDOR_DIR / filename
-            if target.exists() and target.stat().st_size > 0:
-                logger.info(f"FFmpeg vendor exists: {filename}")
-                continue
-            pending_names.append(filename)
-            tasks.append(_download_first_success(client, filename, urls, target))
+        results = await asyncio.gather(
+            *(
+                _download_first_success(client, filename, urls, target)
+                for filename, urls, target in pending
+            ),
+            return_exceptions=False,
+        )
+    failed = [filename for (filename, _, _), ok in zip(pending, results) if not ok]
+    if failed:
+        logger.warning(f"FFmpeg vendor partial ready, failed={failed}")
+
+
+class _StaticFiles(StaticFiles):
+    """静态文件以更大的块发送，ffmpeg-core.wasm 等大文件减少线程读取与发送次数。"""
+
+    chunk_size = 1024 * 1024
 
-        if not tasks:
-            return
-        results = await asyncio.gather(*tasks, return_exceptions=False)
-        failed = [name for name, ok in zip(pending_names, results) if not ok]
-        if failed:
-            logger.warning(f"FFmpeg vendor partial ready, failed={failed}")
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        if isinstance(response, FileResponse):
+            response.chunk_size = self.chunk_size
+        return response
 
 
 @asynccontextmanager
@@ -168,6 +280,14 @@ async def lifespan(app: FastAPI):
     if StorageFactory._instance:
         await StorageFactory._instance.close()
 
+    from app.services.grok.services.video import close_video_session
+
+    await close_video_session()
+
+    from app.services.grok.utils.upload import close_upload_session
+
+    await close_upload_session()
+
     if refresh_enabled:
         scheduler = get_scheduler()
         scheduler.stop()
@@ -220,7 +340,7 @@ def create_app() -> FastAPI:
     # 静态文件服务
     static_dir = APP_DIR / "static"
     if static_dir.exists():
-        app.mount("/static", StaticFiles(directory=static_dir), name="static")
+        app.mount("/static", _StaticFiles(directory=static_dir), name="static")
 
     # 注册管理与公共路由
     app.include_router(admin_router, prefix="/v1/admin")